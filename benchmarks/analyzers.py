@@ -0,0 +1,288 @@
+"""
+Measure the throughput, latency, and memory use of metanl's analyzers on
+workloads made from the Leeds Internet Corpus frequency lists in
+metanl/data/source-data.
+
+Usage:
+
+    python benchmarks/analyzers.py [--texts N] [--seed S] [--only NAME]
+                                   [--json] [--output FILE]
+                                   [--fake] [--fake-delay SECONDS]
+                                   [--fake-repeat N]
+
+Each workload is a list of texts whose words are drawn at random from a
+frequency list, weighted by their frequency, so common words are repeated
+the way they are in real text. The same seed always produces the same
+texts.
+
+MeCab and FreeLing are benchmarked with the real programs when they're
+installed, and with the stand-ins in metanl.fakes when they aren't; the
+results say which was used. `--fake` uses the stand-ins even when the real
+programs are there, and `--fake-delay` and `--fake-repeat` make them slower
+or more verbose, to see how batching and pooling cope. Benchmarks whose
+data isn't available, such as the NLTK ones without NLTK's models, are
+reported as skipped.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+
+def read_frequency_list(lang):
+    """
+    Read the words and frequencies from the Leeds list for a language.
+    """
+    from metanl.leeds_corpus_reader import FrequencyList, source_data_path
+    with FrequencyList(source_data_path('internet-' + lang)) as freqs:
+        words = list(freqs.words())
+        weights = [freq for rank, freq, word in freqs]
+    return words, weights
+
+
+def zipf_texts(lang, count, words_per_text, seed, joiner=' '):
+    """
+    Make `count` texts of `words_per_text` words each, drawn from the
+    frequency list for `lang`.
+    """
+    words, freqs = read_frequency_list(lang)
+    rng = random.Random(seed)
+    return [joiner.join(rng.choices(words, weights=freqs, k=words_per_text))
+            for _ in range(count)]
+
+
+def camel_texts(count, seed):
+    """
+    Make CamelCase identifiers out of Spanish words, for un_camel_case().
+    """
+    return [text.title().replace(' ', '')
+            for text in zipf_texts('es', count, 4, seed)]
+
+
+def long_camel_texts(count, seed):
+    """
+    Make CamelCase identifiers of 1000 Spanish words each.
+    """
+    return [text.title().replace(' ', '')
+            for text in zipf_texts('es', max(count // 20, 1), 1000, seed)]
+
+
+def measure(func, texts, batch=False):
+    """
+    Run `func` on each text (or, if `batch` is true, on the whole list at
+    once), and report its throughput, latency, and peak memory use.
+
+    Memory is measured in a second run, because tracing memory allocations
+    slows everything down.
+    """
+    latencies = []
+    start = time.perf_counter()
+    if batch:
+        func(texts)
+    else:
+        for text in texts:
+            text_start = time.perf_counter()
+            func(text)
+            latencies.append(time.perf_counter() - text_start)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    if batch:
+        func(texts)
+    else:
+        for text in texts:
+            func(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'texts': len(texts),
+        'seconds': elapsed,
+        'texts_per_second': len(texts) / elapsed,
+        'chars_per_second': sum(len(text) for text in texts) / elapsed,
+        'peak_memory_kb': peak / 1024,
+    }
+    if latencies:
+        latencies.sort()
+        result['p50_us'] = statistics.median(latencies) * 1e6
+        result['p99_us'] = latencies[int(len(latencies) * 0.99)] * 1e6
+    return result
+
+
+def process_factories(fake=False, **fake_options):
+    """
+    Get functions that make a MeCab and a Spanish FreeLing wrapper, using the
+    stand-ins if `fake` is true or the real programs aren't installed, and
+    say which ones they are.
+    """
+    from metanl import fakes
+    from metanl.mecab import MeCabWrapper
+    from metanl.freeling import FreelingWrapper
+    if shutil.which('mecab') and not fake:
+        mecab = (MeCabWrapper, 'real')
+    else:
+        mecab = (functools.partial(fakes.FakeMeCabWrapper, **fake_options),
+                 'fake')
+    if shutil.which('analyze') and not fake:
+        freeling = (functools.partial(FreelingWrapper, 'es'), 'real')
+    else:
+        freeling = (functools.partial(fakes.FakeFreelingWrapper, 'es',
+                                      **fake_options), 'fake')
+    return {'mecab': mecab, 'freeling': freeling}
+
+
+def benchmarks(count, seed, fake=False, **fake_options):
+    """
+    Yield (name, function, texts, batch, notes) for each benchmark.
+    Functions are imported lazily so that a missing dependency only skips
+    the benchmarks that need it.
+    """
+    from metanl import token_utils, nltk_morphy
+    english_like = zipf_texts('es', count, 20, seed)
+    japanese = zipf_texts('ja', count, 20, seed)
+    long_japanese = zipf_texts('ja', max(count // 20, 1), 1000, seed,
+                               joiner='')
+
+    yield ('tokenize:regex',
+           lambda text: token_utils.tokenize(text, engine='regex'),
+           english_like, False, {})
+    yield ('tokenize:nltk',
+           lambda text: token_utils.tokenize(text, engine='nltk'),
+           english_like, False, {})
+    yield ('un_camel_case', token_utils.un_camel_case,
+           camel_texts(count, seed), False, {})
+    yield ('un_camel_case:long', token_utils.un_camel_case,
+           long_camel_texts(count, seed), False, {})
+    yield ('un_camel_case_many', token_utils.un_camel_case_many,
+           camel_texts(count, seed), True, {})
+    yield ('string_pieces', lambda text: list(token_utils.string_pieces(text)),
+           long_japanese, False, {})
+    yield ('untokenize', token_utils.untokenize,
+           [token_utils.tokenize(text, engine='regex')
+            for text in english_like],
+           False, {})
+    yield ('nltk_morphy.normalize_list', nltk_morphy.normalize_list,
+           english_like, False, {})
+
+    from metanl import mecab
+    yield ('mecab.romanize_kana', mecab.romanize_kana, japanese, False, {})
+
+    from metanl.extprocess import ProcessPool
+    factories = process_factories(fake, **fake_options)
+    mecab_factory, mecab_kind = factories['mecab']
+    freeling_factory, freeling_kind = factories['freeling']
+    mecab = mecab_factory()
+    freeling = freeling_factory()
+    freeling_pool = ProcessPool(freeling_factory, size=4)
+    yield ('mecab.normalize_list', mecab.normalize_list, japanese, False,
+           {'process': mecab_kind})
+    yield ('mecab.normalize_list_many', mecab.normalize_list_many, japanese,
+           True, {'process': mecab_kind})
+    yield ('freeling.normalize_list', freeling.normalize_list, english_like,
+           False, {'process': freeling_kind})
+    yield ('freeling.normalize_list_many', freeling.normalize_list_many,
+           english_like, True, {'process': freeling_kind})
+    yield ('freeling.pool.normalize_list_many',
+           freeling_pool.normalize_list_many, english_like, True,
+           {'process': freeling_kind})
+
+
+def describe_error(error):
+    """
+    Summarize an error in one line. (NLTK's errors about missing data are
+    many lines long, surrounded by asterisks.)
+    """
+    for line in str(error).split('\n'):
+        line = line.strip()
+        if any(char.isalpha() for char in line):
+            return '%s: %s' % (error.__class__.__name__, line)
+    return error.__class__.__name__
+
+
+def run(count, seed, only=None, fake=False, **fake_options):
+    results = {}
+    for name, func, texts, batch, notes in benchmarks(count, seed, fake,
+                                                      **fake_options):
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        try:
+            # Run once first, so one-time loading and starting processes
+            # aren't counted.
+            func(texts[:8] if batch else texts[0])
+            result = measure(func, texts, batch)
+        except (LookupError, ImportError, OSError) as e:
+            result = {'skipped': describe_error(e)}
+        result.update(notes)
+        results[name] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0]
+    )
+    parser.add_argument('--texts', type=int, default=1000,
+                        help='the number of texts in each workload')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', action='append',
+                        help='run only benchmarks whose names start with this '
+                             '(can be repeated)')
+    parser.add_argument('--json', action='store_true',
+                        help='output the results as JSON')
+    parser.add_argument('--output', help='write the JSON results to a file')
+    parser.add_argument('--fake', action='store_true',
+                        help='use stand-ins for MeCab and FreeLing even if '
+                             'they are installed')
+    parser.add_argument('--fake-delay', type=float, default=0,
+                        help='seconds the stand-ins wait before answering '
+                             'each line')
+    parser.add_argument('--fake-repeat', type=int, default=1,
+                        help='how many times the stand-ins repeat each line '
+                             'of output')
+    args = parser.parse_args()
+
+    results = run(args.texts, args.seed, args.only, args.fake,
+                  delay=args.fake_delay, repeat=args.fake_repeat)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'texts': args.texts,
+        'seed': args.seed,
+        'fake_delay': args.fake_delay,
+        'fake_repeat': args.fake_repeat,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2, sort_keys=True)
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+        return
+    for name, result in results.items():
+        if 'skipped' in result:
+            print('%-34s skipped (%s)' % (name, result['skipped']))
+            continue
+        latency = ''
+        if 'p50_us' in result:
+            latency = '   p50 %8.1f us   p99 %8.1f us' % (result['p50_us'],
+                                                          result['p99_us'])
+        print('%-34s %10.1f texts/s%s   peak %8.1f KB%s' % (
+            name, result['texts_per_second'], latency,
+            result['peak_memory_kb'],
+            '   (%s process)' % result['process'] if 'process' in result
+            else ''
+        ))
+
+
+if __name__ == '__main__':
+    main()
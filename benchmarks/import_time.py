@@ -0,0 +1,81 @@
+"""
+Measure how long it takes to import each metanl module in a fresh Python
+process, so that changes that make startup slower are easy to spot.
+
+Usage:
+
+    python benchmarks/import_time.py [--repeat N] [--json]
+
+Every module in the metanl package is timed. Each one is imported `N`
+times, each time in a new interpreter, and the fastest and median times are
+reported in milliseconds.
+"""
+import argparse
+import json
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+
+TIMING_CODE = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def package_modules():
+    """
+    List the modules in the metanl package, found from its files so that
+    the package itself doesn't have to be imported.
+    """
+    return sorted('metanl.' + name for _, name, _ in
+                  pkgutil.iter_modules([os.path.join(REPO_DIR, 'metanl')]))
+
+
+def time_import(module, repeat):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    times = []
+    for _ in range(repeat):
+        try:
+            output = subprocess.check_output(
+                [sys.executable, '-c', TIMING_CODE.format(module=module)],
+                env=env, stderr=subprocess.DEVNULL
+            )
+        except subprocess.CalledProcessError:
+            return {'error': 'import failed'}
+        times.append(float(output) * 1000)
+    return {'min_ms': min(times), 'median_ms': statistics.median(times)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().split('\n')[0]
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true',
+                        help='output the results as JSON')
+    args = parser.parse_args()
+
+    modules = package_modules()
+    results = {module: time_import(module, args.repeat) for module in modules}
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        for module in modules:
+            result = results[module]
+            if 'error' in result:
+                print('%-28s %s' % (module, result['error']))
+            else:
+                print('%-28s min %7.1f ms   median %7.1f ms' % (
+                    module, result['min_ms'], result['median_ms']
+                ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the speed of the 'nltk' and 'regex' engines of
+metanl.token_utils.tokenize, and check that they agree on the texts used.
+
+Usage:
+
+    python benchmarks/tokenize_speed.py [--number N]
+
+The 'nltk' engine needs NLTK's Punkt models to be installed; if they aren't,
+only the regex engine is timed.
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from metanl.token_utils import tokenize
+
+SENTENCE = ('"Very deep," said Arthur, "you should send that in to the '
+            'Reader\'s Digest. They\'ve got a page for people like you." ')
+TEXTS = {
+    'one sentence': "I can't. Avoid fragments.",
+    'paragraph': SENTENCE * 3,
+    'long document': SENTENCE * 100,
+}
+
+
+def time_engine(text, engine, number):
+    seconds = timeit.timeit(lambda: tokenize(text, engine=engine),
+                            number=number)
+    return seconds / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    for name, text in sorted(TEXTS.items()):
+        regex_us = time_engine(text, 'regex', args.number)
+        try:
+            agree = tokenize(text, engine='nltk') == tokenize(text,
+                                                               engine='regex')
+            nltk_us = time_engine(text, 'nltk', args.number)
+        except LookupError:
+            print('%-14s regex %9.1f us   (nltk engine unavailable)'
+                  % (name, regex_us))
+            continue
+        print('%-14s regex %9.1f us   nltk %9.1f us   speedup %4.1fx%s' % (
+            name, regex_us, nltk_us, nltk_us / regex_us,
+            '' if agree else '   OUTPUTS DIFFER'
+        ))
+
+
+if __name__ == '__main__':
+    main()
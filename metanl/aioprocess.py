@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+An asyncio front-end for the external-process analyzers in extprocess.py,
+so that a program running an event loop can wait for MeCab or FreeLing
+without tying up a thread. This module requires Python 3.7 or later.
+
+The AsyncProcessWrapper runs its own copy of the process, but it leaves
+everything about the process's input and output format to an ordinary
+ProcessWrapper, so the results are the same as that wrapper's results:
+
+    >>> from metanl.freeling import FreelingWrapper
+    >>> english = AsyncProcessWrapper(FreelingWrapper('en'))
+    >>> asyncio.run(english.normalize('big dogs'))
+    'big dog'
+"""
+
+import asyncio
+import subprocess
+from metanl.extprocess import ProcessError, ProcessTimeout
+
+
+class AsyncProcessWrapper(object):
+    """
+    Run an external NLP process as an asyncio subprocess.
+
+    The constructor takes the ProcessWrapper that knows how to talk to the
+    process, such as a MeCabWrapper or a FreelingWrapper. That wrapper is
+    used for its command line and for parsing; it won't start its own
+    process unless you use it directly.
+
+    Coroutines that want results at the same time are queued up and take
+    turns with the pipe, in the order they asked.
+
+    If the wrapper has a `timeout`, each text has that many seconds to be
+    analyzed once its turn comes, or the process is killed and
+    ProcessTimeout is raised. If the process fails, the wrapper's
+    `restart_policy` decides whether to restart it and try again.
+    """
+    def __init__(self, wrapper):
+        self.wrapper = wrapper
+        self._process = None
+        self._lock = None
+        self._output = b''
+        self._output_pos = 0
+
+    def _get_lock(self):
+        # Create the lock lazily, so it belongs to the event loop that's
+        # actually running.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _get_process(self):
+        """
+        Start the process, using the command that the wrapper would run.
+        """
+        command = self.wrapper._get_command()
+        try:
+            return await asyncio.create_subprocess_exec(
+                *command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        except OSError:
+            raise ProcessError("Couldn't start the external process %r."
+                               % command)
+
+    async def get_process(self):
+        """
+        Get the running process, starting it if necessary.
+        """
+        if self._process is None:
+            self._process = await self._get_process()
+            self._output = b''
+            self._output_pos = 0
+        return self._process
+
+    def _kill(self):
+        """
+        Stop the process immediately, without waiting for it, so the next
+        request will start a new one.
+        """
+        if self._process is not None:
+            if self._process.returncode is None:
+                self._process.kill()
+            self._process = None
+
+    async def close(self):
+        """
+        Close the pipe, and wait for the process to exit.
+        """
+        if self._process is not None:
+            process = self._process
+            self._process = None
+            process.stdin.close()
+            await process.wait()
+
+    async def restart_process(self):
+        self._kill()
+        return await self.get_process()
+
+    async def _read_output(self, process):
+        """
+        Add the next chunk of the process's output to our buffer.
+
+        We keep our own buffer, as ProcessWrapper does, instead of using the
+        stream's readline(), which fails on lines longer than its limit.
+        """
+        chunk = await process.stdout.read(self.wrapper.read_size)
+        if not chunk:
+            raise ProcessError("reached end of output")
+        self._output = self._output[self._output_pos:] + chunk
+        self._output_pos = 0
+
+    async def _receive_line(self, process):
+        # How much of the buffer, after the current position, has no line
+        # break in it
+        searched = 0
+        while True:
+            end = self._output.find(b'\n', self._output_pos + searched)
+            if end >= 0:
+                line = self._output[self._output_pos:end + 1]
+                self._output_pos = end + 1
+                return line
+            searched = len(self._output) - self._output_pos
+            await self._read_output(process)
+
+    async def _receive_records(self, process):
+        lines = []
+        while True:
+            line = await self._receive_line(process)
+            if self.wrapper._is_output_end(line):
+                return self.wrapper._parse_output_block(lines)
+            lines.append(line)
+
+    async def _analyze(self, text):
+        if self.wrapper.timeout is None:
+            return await self._analyze_now(text)
+        try:
+            return await asyncio.wait_for(self._analyze_now(text),
+                                          self.wrapper.timeout)
+        except asyncio.TimeoutError:
+            raise ProcessTimeout("The external process took more than %s "
+                                 "seconds to respond." % self.wrapper.timeout)
+
+    async def _analyze_now(self, text):
+        process = await self.get_process()
+        results = []
+        for line in self.wrapper._get_input_lines(text):
+            process.stdin.write(line)
+            await process.stdin.drain()
+            results.extend(await self._receive_records(process))
+        return results
+
+    async def analyze(self, text):
+        """
+        Run the text through the external process, and return a list of
+        records containing the results.
+
+        If the process dies, it's restarted and the text is tried again, as
+        the wrapper's `restart_policy` allows, the same way as in
+        ProcessWrapper.analyze.
+        """
+        async with self._get_lock():
+            policy = self.wrapper.restart_policy
+            policy.check()
+            attempt = 0
+            while True:
+                try:
+                    result = await self._analyze(text)
+                except BaseException as e:
+                    # If we were cancelled or failed in the middle of a
+                    # request, we don't know where the process is in its
+                    # output anymore.
+                    self._kill()
+                    if isinstance(e, ProcessTimeout):
+                        policy.record_failure()
+                        raise
+                    if not isinstance(e, (ProcessError, BrokenPipeError,
+                                          ConnectionResetError)):
+                        raise
+                    policy.record_failure()
+                    if not policy.should_retry(attempt):
+                        if isinstance(e, ProcessError):
+                            raise
+                        raise ProcessError("couldn't write to the process: "
+                                           "%s" % e)
+                    await asyncio.sleep(policy.start_retry(attempt))
+                    attempt += 1
+                else:
+                    policy.record_success()
+                    return result
+
+    async def tokenize_list(self, text):
+        """
+        Split a text into separate words.
+        """
+        return [self.wrapper.get_record_token(record)
+                for record in await self.analyze(text)]
+
+    async def normalize_list(self, text):
+        """
+        Get a canonical list representation of text. See
+        ProcessWrapper.normalize_list.
+        """
+        return self.wrapper._normalize_records(await self.analyze(text))
+
+    async def normalize(self, text):
+        """
+        Get a canonical string representation of text. See
+        ProcessWrapper.normalize.
+        """
+        return ' '.join(await self.normalize_list(text))
+
+    async def tag_and_stem(self, text):
+        """
+        Get a list of (stem, pos, token) triples. See
+        ProcessWrapper.tag_and_stem.
+        """
+        return self.wrapper._tag_and_stem_records(await self.analyze(text))
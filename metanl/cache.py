@@ -0,0 +1,99 @@
+from __future__ import unicode_literals
+"""
+Caches for NLP results that are expensive to compute, such as the results
+that come from running text through an external process.
+
+Any object with a `get(key)` method that returns None for missing keys, and
+that supports `cache[key] = value`, can be used as a cache. That includes
+plain dicts and `shelve` objects. The LRUCache defined here is one that
+won't grow without bound.
+"""
+
+from collections import OrderedDict
+import threading
+
+
+class LRUCache(object):
+    """
+    A dictionary-like cache that holds at most `maxsize` items. When it's
+    full, adding an item discards the item that was least recently used.
+
+    It keeps count of how many lookups were hits or misses, and it can be
+    shared between threads.
+
+    >>> cache = LRUCache(2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> cache.get('b') is None
+    True
+    >>> sorted(cache.info().items())
+    [('hits', 1), ('maxsize', 2), ('misses', 1), ('size', 2)]
+    """
+    def __init__(self, maxsize=10000):
+        if maxsize < 1:
+            raise ValueError("An LRUCache needs room for at least one item.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get the value stored for `key`, marking it as recently used, or
+        return `default` if it isn't there.
+        """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        """
+        Remove everything from the cache, and reset its counts.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        Get a dictionary of statistics about how the cache has been used.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+        }
+
+
+_MISSING = object()
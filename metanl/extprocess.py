@@ -5,21 +5,31 @@ Tools for using an external program as an NLP pipe. See, for example,
 freeling.py.
 """
 
+import os
+import select
 import subprocess
+import threading
+import time
+from collections import deque
 import unicodedata
 import sys
-from ftfy.fixes import remove_control_chars, remove_unsafe_private_use
 if sys.version_info.major == 2:
+    import Queue as queue
     range = xrange
     str_func = unicode
+    monotonic = time.time
 else:
+    import queue
     str_func = str
+    monotonic = time.monotonic
 
 
 def render_safe(text):
     '''
     Make sure the given text is safe to pass to an external process.
     '''
+    # ftfy takes a while to import, so wait until it's needed.
+    from ftfy.fixes import remove_control_chars, remove_unsafe_private_use
     return remove_control_chars(remove_unsafe_private_use(text))
 
 
@@ -30,6 +40,178 @@ class ProcessError(IOError):
     pass
 
 
+class ProcessTimeout(IOError):
+    """
+    A subclass of IOError raised when the external process takes longer than
+    its wrapper's `timeout` to respond. The process is killed, and a new one
+    will be started the next time it's needed.
+    """
+    pass
+
+
+class ProcessUnavailable(ProcessError):
+    """
+    Raised without trying the external process when its RestartPolicy has
+    given up on it for now, because it kept failing.
+    """
+    pass
+
+
+class ProcessBatchError(ProcessError):
+    """
+    Raised by the methods that handle many texts at once, such as
+    analyze_many(), when some of the texts failed even after the retries
+    that the RestartPolicy allows. The other texts were handled anyway.
+
+    `results` is the list that the method would have returned, with None in
+    place of each text that failed, and `errors` maps the index of each of
+    those texts to the error it got.
+    """
+    def __init__(self, results, errors):
+        ProcessError.__init__(
+            self, "The external process failed on %d of %d texts."
+            % (len(errors), len(results))
+        )
+        self.results = results
+        self.errors = errors
+
+    def map(self, func):
+        """
+        Get the same error for the results of applying `func` to each of
+        these results.
+        """
+        return ProcessBatchError(
+            [None if result is None else func(result)
+             for result in self.results],
+            self.errors
+        )
+
+
+class RestartPolicy(object):
+    """
+    Decides what a ProcessWrapper does when its process fails: how many
+    times to restart it and try the same text again, how long to wait
+    before each retry, and when to stop trying for a while.
+
+    - A text is retried up to `max_retries` times, with a new process each
+      time. The delay before retrying starts at `backoff` seconds and
+      doubles each time, up to `max_backoff`.
+    - After `failure_threshold` failures in a row, the circuit "opens":
+      for the next `reset_after` seconds, requests fail immediately with
+      ProcessUnavailable instead of starting yet another process. After
+      that, the circuit is "half-open": one request is let through to test
+      the process, without retries, while the others keep failing
+      immediately. If it succeeds, things go back to normal; if it fails,
+      the circuit opens again. If the test request hasn't finished after
+      another `reset_after` seconds, one more is let through.
+
+    A RestartPolicy can be shared by several wrappers, such as all the
+    workers in a ProcessPool, to make them give up together. Its counts are
+    available from :meth:`stats`.
+    """
+    def __init__(self, max_retries=3, backoff=0.1, max_backoff=5.0,
+                 failure_threshold=10, reset_after=30.0):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+
+        self.failures = 0
+        self.restarts = 0
+        self.rejected = 0
+        self.consecutive_failures = 0
+        self.opened_at = None
+        # When the request that's testing a half-open circuit started
+        self.trial_started = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """
+        Raise ProcessUnavailable if the circuit is open, or if it's half-open
+        and another request is already testing it.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return
+            now = monotonic()
+            if now - self.opened_at >= self.reset_after and (
+                self.trial_started is None or
+                now - self.trial_started >= self.reset_after
+            ):
+                # Let this request through; it decides whether we stay open.
+                self.trial_started = now
+                return
+            self.rejected += 1
+        raise ProcessUnavailable(
+            "The external process failed %d times in a row, so we're not "
+            "trying it again for %s seconds." % (self.failure_threshold,
+                                                 self.reset_after)
+        )
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_started = None
+
+    def record_failure(self):
+        """
+        Count a failure, and open the circuit if there have been too many
+        in a row.
+        """
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if (self.trial_started is not None or
+                    self.consecutive_failures >= self.failure_threshold):
+                self.opened_at = monotonic()
+                self.trial_started = None
+
+    def should_retry(self, attempt):
+        """
+        Decide whether to make retry number `attempt` (counting from 0).
+        """
+        return attempt < self.max_retries and self.opened_at is None
+
+    def wait(self, attempt):
+        """
+        Sleep before retry number `attempt`, and count the restart that
+        follows it.
+        """
+        delay = self.start_retry(attempt)
+        if delay > 0:
+            time.sleep(delay)
+
+    def start_retry(self, attempt):
+        """
+        Count the restart before retry number `attempt`, and get the number
+        of seconds to wait before it, for callers that wait in their own way,
+        such as with asyncio.
+        """
+        with self._lock:
+            self.restarts += 1
+        return min(self.backoff * 2 ** attempt, self.max_backoff)
+
+    def stats(self):
+        """
+        Get a dictionary of counts that describe how the process has failed.
+        """
+        if self.opened_at is None:
+            state = 'closed'
+        elif self.trial_started is None:
+            state = 'open'
+        else:
+            state = 'half-open'
+        return {
+            'failures': self.failures,
+            'restarts': self.restarts,
+            'rejected': self.rejected,
+            'consecutive_failures': self.consecutive_failures,
+            'state': state,
+        }
+
+
 class ProcessWrapper(object):
     """
     A ProcessWrapper uses the `subprocess` module to keep a process open that
@@ -41,6 +223,66 @@ class ProcessWrapper(object):
     Many methods are intended to be implemented by subclasses of ProcessWrapper
     that actually know what program they're talking to.
     """
+    # The number of bytes of input that analyze_many() will send ahead of the
+    # output it has read.
+    batch_window = 8192
+
+    # The most bytes of output to read from the process at once.
+    read_size = 65536
+
+    # If every block of output ends with the same line, subclasses can set
+    # this to that line, as bytes. Then receive_records() finds the end of
+    # each block in the output buffer and parses the whole block at once,
+    # instead of handling each line separately.
+    output_end = None
+
+    # Defaults for the settings that __init__ takes, so that subclasses that
+    # don't call it still work.
+    cache = None
+    timeout = None
+    stats = None
+    _restart_policy = None
+
+    def __init__(self, cache=None, timeout=None, restart_policy=None,
+                 stats=None):
+        """
+        `cache` is where normalize_list() and tag_and_stem() store their
+        results by default. It can be any object with a `get` method and
+        item assignment, such as a dict or a metanl.cache.LRUCache. If it's
+        None, results aren't cached unless a cache is passed to the method.
+
+        `timeout` is the number of seconds to wait for the process to finish
+        analyzing a text before giving up on it and raising ProcessTimeout.
+        If it's None, we wait as long as it takes. Timeouts depend on being
+        able to poll a pipe, so they don't work on Windows.
+
+        `restart_policy` is a RestartPolicy that says what to do when the
+        process fails. By default, each wrapper gets a new RestartPolicy()
+        of its own.
+
+        `stats` is an optional metanl.stats.Stats object, which will count
+        and time what the wrapper does, under names that start with its
+        `cache_namespace`. If it's None, nothing is measured.
+        """
+        self.cache = cache
+        self.timeout = timeout
+        self._restart_policy = restart_policy
+        self.stats = stats
+
+    @property
+    def restart_policy(self):
+        """
+        The RestartPolicy for this wrapper's process. If none was given, a
+        new one is made the first time it's needed.
+        """
+        if self._restart_policy is None:
+            self._restart_policy = RestartPolicy()
+        return self._restart_policy
+
+    @restart_policy.setter
+    def restart_policy(self, policy):
+        self._restart_policy = policy
+
     def __del__(self):
         """
         Clean up by closing the pipe.
@@ -57,8 +299,16 @@ class ProcessWrapper(object):
         if hasattr(self, '_process'):
             return self._process
         else:
-            self._process = self._get_process()
-            return self._process
+            return self._start_process()
+
+    def _start_process(self):
+        """
+        Start a new process, with an empty buffer for its output.
+        """
+        self._process = self._get_process()
+        self._output = b''
+        self._output_pos = 0
+        return self._process
 
     def _get_command(self):
         """
@@ -91,28 +341,406 @@ class ProcessWrapper(object):
         """
         raise NotImplementedError
 
+    def _get_input_lines(self, text):
+        """
+        Prepare some text to be sent to the external process, as a list of
+        byte strings that each end in a newline. Each of these lines should
+        produce one block of output.
+        """
+        raise NotImplementedError
+
+    def _is_output_end(self, line):
+        """
+        Given a line of output from the process, as bytes, determine whether
+        it's the line that ends a block of output.
+        """
+        raise NotImplementedError
+
+    def _parse_output_line(self, line):
+        """
+        Given a line of output from the process, decoded as Unicode, turn it
+        into a record.
+        """
+        raise NotImplementedError
+
+    def _parse_output_block(self, lines):
+        """
+        Turn the lines of output that make up a block (not including the line
+        that ends it) into a list of records.
+        """
+        return [self._parse_output_line(line.decode('utf-8'))
+                for line in lines]
+
+    def _parse_output_bytes(self, data):
+        """
+        Turn a block of output, as bytes (not including the line that ends
+        it), into a list of records. This is used when `output_end` is set.
+        """
+        return self._parse_output_block(data.splitlines(True))
+
+    def receive_records(self, deadline=None):
+        """
+        Read one block of output from the process, and return the records it
+        contains.
+        """
+        if self.output_end is not None:
+            parse = self._parse_output_bytes
+            output = self.receive_output_block(deadline)
+        else:
+            parse = self._parse_output_block
+            output = []
+            while True:
+                line = self.receive_output_line(deadline)
+                if self._is_output_end(line):
+                    break
+                output.append(line)
+        stats = self.stats
+        if stats is None:
+            return parse(output)
+        start = stats.clock()
+        records = parse(output)
+        stats.record_time(self._stat_name('parse'), stats.clock() - start)
+        return records
+
     def analyze(self, text):
         """
         Take text as input, run it through the external process, and return a
         list of *records* containing the results.
+
+        If the process fails, it's restarted and the text is tried again, as
+        the `restart_policy` allows.
         """
-        raise NotImplementedError
+        stats = self.stats
+        if stats is None:
+            return self._with_restarts(self._analyze, text)
+        start = stats.clock()
+        result = self._with_restarts(self._analyze, text)
+        stats.record_time(self._stat_name('analyze'), stats.clock() - start)
+        return result
+
+    def analyze_many(self, texts):
+        """
+        Run many texts through the external process, and return a list
+        containing the list of records for each text.
+
+        Instead of waiting for the output of each line before sending the next
+        one, this keeps up to `batch_window` bytes of input in flight. That
+        amount is kept well below the capacity of a pipe, so the process can
+        never be stuck writing output that we're not reading because we're
+        stuck writing input that it's not reading.
 
-    def send_input(self, data):
-        self.process.stdin.write(data)
-        self.process.stdin.flush()
+        If there's a `timeout`, each text gets that long to be analyzed,
+        counting from when we start waiting for its output.
 
-    def receive_output_line(self):
-        line = self.process.stdout.readline()
-        if not line:
+        If the process fails, the texts that were finished keep their
+        results, and the batch is resumed in a new process from the first
+        unfinished text. That text is retried as the `restart_policy` allows,
+        as in :meth:`analyze`. A text that fails every time, or times out,
+        is skipped, and the rest of the batch goes on without it; then
+        ProcessBatchError is raised, holding the results of the other texts.
+        """
+        texts = list(texts)
+        stats = self.stats
+        if stats is None:
+            return self._analyze_many_with_restarts(texts)
+        start = stats.clock()
+        result = self._analyze_many_with_restarts(texts)
+        stats.record_time(self._stat_name('analyze_many'),
+                          stats.clock() - start)
+        stats.count(self._stat_name('texts'), len(texts))
+        return result
+
+    def _with_restarts(self, func, arg):
+        """
+        Return `func(arg)`, restarting the process and trying again when it
+        raises ProcessError, as the restart policy allows.
+        """
+        policy = self.restart_policy
+        policy.check()
+        attempt = 0
+        while True:
+            try:
+                result = func(arg)
+            except ProcessTimeout:
+                # The process has already been killed; a timeout is worth
+                # counting, but not worth waiting for again.
+                policy.record_failure()
+                if self.stats is not None:
+                    self.stats.count(self._stat_name('timeouts'))
+                raise
+            except ProcessError:
+                policy.record_failure()
+                if self.stats is not None:
+                    self.stats.count(self._stat_name('failures'))
+                if not policy.should_retry(attempt):
+                    raise
+                policy.wait(attempt)
+                attempt += 1
+                self.restart_process()
+                if self.stats is not None:
+                    self.stats.count(self._stat_name('restarts'))
+            else:
+                policy.record_success()
+                return result
+
+    def _analyze_many_with_restarts(self, texts):
+        """
+        Run :meth:`_analyze_many` until every text is finished or has
+        failed, restarting the process when it fails, as described in
+        :meth:`analyze_many`.
+        """
+        policy = self.restart_policy
+        results = []
+        errors = {}
+        attempt = 0
+        while len(results) < len(texts):
+            try:
+                policy.check()
+            except ProcessUnavailable as e:
+                if not results:
+                    raise
+                # We've given up on the process partway through the batch.
+                for index in range(len(results), len(texts)):
+                    errors[index] = e
+                    results.append(None)
+                break
+            before = len(results)
+            try:
+                self._analyze_many(texts, results)
+            except (ProcessError, ProcessTimeout) as e:
+                if len(results) > before:
+                    # Some texts got through, so this failure doesn't
+                    # follow the last one, and it's a new text's first.
+                    policy.record_success()
+                    attempt = 0
+                policy.record_failure()
+                if isinstance(e, ProcessTimeout):
+                    # The process has already been killed; a timeout is
+                    # worth counting, but not worth waiting for again.
+                    if self.stats is not None:
+                        self.stats.count(self._stat_name('timeouts'))
+                    retry = False
+                else:
+                    if self.stats is not None:
+                        self.stats.count(self._stat_name('failures'))
+                    retry = policy.should_retry(attempt)
+                if retry:
+                    policy.wait(attempt)
+                    attempt += 1
+                    self.restart_process()
+                    if self.stats is not None:
+                        self.stats.count(self._stat_name('restarts'))
+                else:
+                    # Give up on this text, and go on to the next one in a
+                    # new process.
+                    errors[len(results)] = e
+                    results.append(None)
+                    attempt = 0
+                    self._kill_process()
+            else:
+                policy.record_success()
+        if errors:
+            raise ProcessBatchError(results, errors)
+        return results
+
+    def _analyze(self, text):
+        self.process  # make sure things are loaded
+        deadline = self._get_deadline()
+        results = []
+        for line in self._get_input_lines(text):
+            self.send_input(line)
+            results.extend(self.receive_records(deadline))
+        return results
+
+    def _analyze_many(self, texts, results):
+        """
+        Analyze the texts from number `len(results)` on, appending the
+        records for each text to `results` as soon as all of them have been
+        received. If this fails, `results` still holds the texts that were
+        finished.
+        """
+        self.process  # make sure things are loaded
+        start = len(results)
+        analyses = [[] for index in range(start, len(texts))]
+        # The text index and size of each line we're waiting to hear back
+        # about, and whether it's the last line of its text
+        pending = deque()
+        in_flight = 0
+        waiting_for = [None, None]  # a text index and its deadline
+
+        def receive():
+            index, size, last = pending.popleft()
+            if waiting_for[0] != index:
+                waiting_for[:] = [index, self._get_deadline()]
+            analyses[index - start].extend(
+                self.receive_records(waiting_for[1])
+            )
+            if last:
+                # This text is finished, and so is every text before it.
+                results.extend(analyses[len(results) - start:
+                                        index - start + 1])
+            return size
+
+        for index in range(start, len(texts)):
+            lines = self._get_input_lines(texts[index])
+            for line_index, line in enumerate(lines):
+                if pending and in_flight + len(line) > self.batch_window:
+                    self.flush_input()
+                    while (pending and
+                           in_flight + len(line) > self.batch_window):
+                        in_flight -= receive()
+                self.send_input(line, flush=False)
+                pending.append((index, len(line),
+                                line_index == len(lines) - 1))
+                in_flight += len(line)
+        self.flush_input()
+        while pending:
+            receive()
+        # Texts at the end with no lines to send are finished too.
+        results.extend(analyses[len(results) - start:])
+
+    def send_input(self, data, flush=True):
+        stats = self.stats
+        if stats is not None:
+            start = stats.clock()
+        try:
+            self.process.stdin.write(data)
+            if flush:
+                self.process.stdin.flush()
+        except (IOError, OSError) as e:
+            if isinstance(e, ProcessError):
+                raise
+            raise ProcessError("couldn't write to the process: %s" % e)
+        if stats is not None:
+            stats.record_time(self._stat_name('send_input'),
+                              stats.clock() - start)
+            stats.count(self._stat_name('bytes_in'), len(data))
+
+    def flush_input(self):
+        self.send_input(b'', flush=True)
+
+    def receive_output_line(self, deadline=None):
+        """
+        Read one line of output from the process, as bytes.
+
+        If `deadline` is given, as a value of the `monotonic` clock, and the
+        line doesn't arrive by then, the process is killed and ProcessTimeout
+        is raised.
+        """
+        while True:
+            end = self._output.find(b'\n', self._output_pos)
+            if end >= 0:
+                line = self._output[self._output_pos:end + 1]
+                self._output_pos = end + 1
+                return line
+            self._read_output(deadline)
+
+    def receive_output_block(self, deadline=None):
+        """
+        Read the lines of output up to the next `output_end` line, and return
+        them as bytes, without the `output_end` line. The deadline works as
+        it does in :meth:`receive_output_line`.
+        """
+        end_line = self.output_end
+        # How much of the buffer, after the current position, is known not
+        # to contain the end of the block
+        searched = 0
+        while True:
+            output = self._output
+            pos = self._output_pos
+            if output.startswith(end_line, pos):
+                self._output_pos = pos + len(end_line)
+                return b''
+            end = output.find(b'\n' + end_line, pos + searched)
+            if end >= 0:
+                self._output_pos = end + 1 + len(end_line)
+                return output[pos:end + 1]
+            searched = max(len(output) - pos - len(end_line), 0)
+            self._read_output(deadline)
+
+    def _read_output(self, deadline):
+        """
+        Add whatever output the process has ready to our buffer, waiting for
+        some if there isn't any.
+
+        We read from the pipe's file descriptor ourselves, instead of using
+        the file object's readline(), so that we can wait on it with a
+        timeout and never block in the middle of a line.
+        """
+        stats = self.stats
+        if stats is not None:
+            start = stats.clock()
+        fd = self.process.stdout.fileno()
+        if deadline is not None and not self._wait_for_output(fd, deadline):
+            self._kill_process()
+            raise ProcessTimeout("The external process took more than %s "
+                                 "seconds to respond." % self.timeout)
+        chunk = os.read(fd, self.read_size)
+        if not chunk:
             raise ProcessError("reached end of output")
-        return line
+        if stats is not None:
+            stats.record_time(self._stat_name('receive_output'),
+                              stats.clock() - start)
+            stats.count(self._stat_name('bytes_out'), len(chunk))
+        self._output = self._output[self._output_pos:] + chunk
+        self._output_pos = 0
 
-    def restart_process(self):
+    def _wait_for_output(self, fd, deadline):
+        """
+        Wait until the file descriptor `fd` can be read or the deadline
+        passes, and return whether it can be read.
+        """
+        remaining = max(deadline - monotonic(), 0)
+        if hasattr(select, 'poll'):
+            poller = select.poll()
+            poller.register(fd, select.POLLIN)
+            # poll() counts in milliseconds; round up so we don't give up
+            # early.
+            return bool(poller.poll(int(remaining * 1000) + 1))
+        readable, _, _ = select.select([fd], [], [], remaining)
+        return bool(readable)
+
+    def _get_deadline(self):
+        """
+        Get the time by which the text we're about to analyze should be done,
+        or None if there's no timeout.
+        """
+        if self.timeout is None:
+            return None
+        return monotonic() + self.timeout
+
+    def _kill_process(self):
+        """
+        Kill the process, so that a new one is started the next time one is
+        needed.
+        """
         if hasattr(self, '_process'):
-            self._process.stdin.close()
-        self._process = self._get_process()
-        return self._process
+            process = self._process
+            del self._process
+            if process.poll() is None:
+                process.kill()
+            try:
+                process.stdin.close()
+            except (IOError, OSError):
+                # There was input left that the process will never read.
+                pass
+            process.stdout.close()
+            process.wait()
+
+    def warmup(self):
+        """
+        Start the external process now, instead of waiting for the first
+        time it's needed.
+        """
+        self.process
+
+    def restart_process(self):
+        """
+        Replace the process with a new one. The old one is killed and waited
+        for, so that crashed processes don't pile up as zombies.
+        """
+        self._kill_process()
+        return self._start_process()
 
     def tokenize_list(self, text):
         """
@@ -168,15 +796,12 @@ class ProcessWrapper(object):
         else:
             return 'TERM'
 
-    def normalize_list(self, text, cache=None):
+    def _normalize_records(self, analysis):
         """
-        Get a canonical list representation of text, with words
-        separated and reduced to their base forms.
-
-        TODO: use the cache.
+        Get the list of word roots that :meth:`normalize_list` returns, given
+        the records that came from analyzing the text.
         """
         words = []
-        analysis = self.analyze(text)
         for record in analysis:
             if not self.is_stopword_record(record):
                 words.append(self.get_record_root(record))
@@ -185,12 +810,131 @@ class ProcessWrapper(object):
             words = [self.get_record_token(record) for record in analysis]
         return words
 
+    def _tag_and_stem_records(self, analysis):
+        """
+        Get the list of triples that :meth:`tag_and_stem` returns, given the
+        records that came from analyzing the text.
+        """
+        triples = []
+        for record in analysis:
+            root = self.get_record_root(record)
+            token = self.get_record_token(record)
+
+            if token:
+                if unicode_is_punctuation(token):
+                    triples.append((token, '.', token))
+                else:
+                    pos = self.get_record_pos(record)
+                    triples.append((root, pos, token))
+        return triples
+
+    @property
+    def cache_namespace(self):
+        """
+        A string that distinguishes this wrapper's cached results from those
+        of other wrappers that might share the same cache.
+        """
+        return self.__class__.__name__
+
+    def _stat_name(self, name):
+        return '%s.%s' % (self.cache_namespace, name)
+
+    def _count_cache_lookups(self, hits, misses):
+        if self.stats is not None:
+            self.stats.count(self._stat_name('cache_hits'), hits)
+            self.stats.count(self._stat_name('cache_misses'), misses)
+
+    def _cache_key(self, method, text):
+        return '%s\t%s\t%s' % (self.cache_namespace, method, text)
+
+    def _cached(self, method, text, cache, compute):
+        """
+        Get the result of `compute(text)` from the cache if it's there.
+        Otherwise, compute it and store it in the cache.
+
+        Results are stored as tuples, and returned as new lists, so that
+        callers can't modify what's in the cache.
+        """
+        if cache is None:
+            cache = self.cache
+        if cache is None:
+            return compute(text)
+        key = self._cache_key(method, text)
+        result = cache.get(key)
+        if result is None:
+            self._count_cache_lookups(0, 1)
+            result = compute(text)
+            cache[key] = tuple(result)
+            return result
+        self._count_cache_lookups(1, 0)
+        return list(result)
+
+    def _cached_many(self, method, texts, cache, compute_many):
+        """
+        Like :meth:`_cached`, but for a list of texts. The texts that aren't
+        in the cache are computed together, in one call to `compute_many`.
+
+        If that raises ProcessBatchError, the results it has are cached
+        anyway, and it's raised again with all the results for `texts`.
+        """
+        texts = list(texts)
+        if cache is None:
+            cache = self.cache
+        if cache is None:
+            return compute_many(texts)
+        results = [None] * len(texts)
+        missing = []
+        for index, text in enumerate(texts):
+            found = cache.get(self._cache_key(method, text))
+            if found is None:
+                missing.append(index)
+            else:
+                results[index] = list(found)
+        self._count_cache_lookups(len(texts) - len(missing), len(missing))
+        if missing:
+            errors = {}
+            try:
+                computed = compute_many([texts[index] for index in missing])
+            except ProcessBatchError as e:
+                computed = e.results
+                errors = dict((missing[position], error)
+                              for position, error in e.errors.items())
+            for index, result in zip(missing, computed):
+                if result is not None:
+                    key = self._cache_key(method, texts[index])
+                    cache[key] = tuple(result)
+                results[index] = result
+            if errors:
+                raise ProcessBatchError(results, errors)
+        return results
+
+    def _records_many(self, func, texts):
+        """
+        Analyze many texts with :meth:`analyze_many`, and apply `func` to
+        the records of each one.
+        """
+        try:
+            return [func(analysis) for analysis in self.analyze_many(texts)]
+        except ProcessBatchError as e:
+            raise e.map(func)
+
+    def normalize_list(self, text, cache=None):
+        """
+        Get a canonical list representation of text, with words
+        separated and reduced to their base forms.
+
+        The result is looked up in `cache` first, or in this wrapper's
+        cache if `cache` is None, and stored there after it's computed.
+        """
+        return self._cached(
+            'normalize_list', text, cache,
+            lambda text: self._normalize_records(self.analyze(text))
+        )
+
     def normalize(self, text, cache=None):
         """
         Get a canonical string representation of this text, like
         :meth:`normalize_list` but joined with spaces.
-
-        TODO: use the cache.
         """
         return ' '.join(self.normalize_list(text, cache))
 
@@ -205,21 +949,45 @@ class ProcessWrapper(object):
         have without the leading # or @. For instance, if the reader's triple
         for "thing" is ('thing', 'NN', 'things'), then "#things" would come out
         as ('thing', 'NN', '#things').
+
+        Results are cached the same way as in :meth:`normalize_list`.
         """
-        analysis = self.analyze(text)
-        triples = []
+        return self._cached(
+            'tag_and_stem', text, cache,
+            lambda text: self._tag_and_stem_records(self.analyze(text))
+        )
 
-        for record in analysis:
-            root = self.get_record_root(record)
-            token = self.get_record_token(record)
+    def normalize_list_many(self, texts, cache=None):
+        """
+        Get the :meth:`normalize_list` result for each of many texts, using
+        :meth:`analyze_many` to send them to the process in batches.
+        """
+        return self._cached_many(
+            'normalize_list', texts, cache,
+            lambda texts: self._records_many(self._normalize_records, texts)
+        )
 
-            if token:
-                if unicode_is_punctuation(token):
-                    triples.append((token, '.', token))
-                else:
-                    pos = self.get_record_pos(record)
-                    triples.append((root, pos, token))
-        return triples
+    def normalize_many(self, texts, cache=None):
+        """
+        Get the :meth:`normalize` result for each of many texts, using
+        :meth:`analyze_many` to send them to the process in batches.
+        """
+        try:
+            lists = self.normalize_list_many(texts, cache)
+        except ProcessBatchError as e:
+            raise e.map(' '.join)
+        return [' '.join(words) for words in lists]
+
+    def tag_and_stem_many(self, texts, cache=None):
+        """
+        Get the :meth:`tag_and_stem` result for each of many texts, using
+        :meth:`analyze_many` to send them to the process in batches.
+        """
+        return self._cached_many(
+            'tag_and_stem', texts, cache,
+            lambda texts: self._records_many(self._tag_and_stem_records,
+                                             texts)
+        )
 
     def extract_phrases(self, text):
         """
@@ -243,6 +1011,181 @@ class ProcessWrapper(object):
                         break
 
 
+class ProcessPool(ProcessWrapper):
+    """
+    A ProcessPool runs several copies of the same external process, so that
+    many threads can get NLP results at once instead of waiting in line for
+    a single pipe.
+
+    It's constructed from a `factory`, a function of no arguments that returns
+    a new ProcessWrapper, such as `MeCabWrapper` or
+    `functools.partial(FreelingWrapper, 'en')`. Like a ProcessWrapper, it
+    starts processes only when they're needed, and it will start at most
+    `size` of them.
+
+    A ProcessPool can be used anywhere its wrappers could be used. Each call
+    to :meth:`analyze` borrows an idle wrapper, and the resulting records are
+    interpreted exactly the way that wrapper would interpret them.
+
+    If `stats` is given, the pool counts its cache lookups and how long
+    requests wait for an idle wrapper there, and it gives the same Stats
+    object to each wrapper it creates.
+
+    The pool doesn't take a `timeout` or `restart_policy` of its own, because
+    it has no process to time out or restart. Give them to the factory
+    instead, as in `functools.partial(FreelingWrapper, 'en', timeout=10)`,
+    and each wrapper will apply them to its own process.
+    """
+    def __init__(self, factory, size=4, cache=None, stats=None):
+        # There's no restart policy to make here; the wrappers have their own.
+        self.cache = cache
+        self.stats = stats
+        if size < 1:
+            raise ValueError("A ProcessPool needs room for at least one "
+                             "process.")
+        self.factory = factory
+        self.size = size
+
+        # The first wrapper doubles as the one we ask about records. It
+        # doesn't start a process until it's asked to analyze something.
+        self._template = self._new_worker()
+        self._workers = [self._template]
+        self._idle = queue.LifoQueue()
+        self._idle.put(self._template)
+        self._lock = threading.Lock()
+
+    def _get_process(self):
+        raise NotImplementedError("A ProcessPool has no single process. "
+                                  "Its wrappers each run their own.")
+
+    def restart_process(self):
+        raise NotImplementedError("A ProcessPool has no single process. "
+                                  "Its wrappers each run their own.")
+
+    def warmup(self):
+        """
+        Start all `size` of the pool's processes now, instead of waiting
+        until there's enough demand for them. If some of the wrappers are
+        busy, this waits for them to be released.
+        """
+        workers = [self._acquire() for _ in range(self.size)]
+        try:
+            for worker in workers:
+                worker.warmup()
+        finally:
+            for worker in workers:
+                self._release(worker)
+
+    def _new_worker(self):
+        worker = self.factory()
+        if self.stats is not None:
+            worker.stats = self.stats
+        return worker
+
+    def _acquire(self):
+        """
+        Borrow an idle wrapper, creating a new one if the pool isn't full
+        yet, or waiting for one to be released if it is.
+        """
+        try:
+            # LIFO order means we keep reusing the processes that are
+            # already running, and only start more under real contention.
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = self._new_worker()
+                self._workers.append(worker)
+                return worker
+        stats = self.stats
+        if stats is None:
+            return self._idle.get()
+        start = stats.clock()
+        worker = self._idle.get()
+        stats.record_time(self._stat_name('pool_wait'), stats.clock() - start)
+        return worker
+
+    def _release(self, worker):
+        self._idle.put(worker)
+
+    @property
+    def cache_namespace(self):
+        return self._template.cache_namespace
+
+    def get_record_root(self, record):
+        return self._template.get_record_root(record)
+
+    def get_record_token(self, record):
+        return self._template.get_record_token(record)
+
+    def get_record_pos(self, record):
+        return self._template.get_record_pos(record)
+
+    def is_stopword_record(self, record, common_words=False):
+        return self._template.is_stopword_record(record)
+
+    def analyze(self, text):
+        """
+        Run the text through whichever external process is free, and return
+        its list of records.
+        """
+        worker = self._acquire()
+        try:
+            return worker.analyze(text)
+        finally:
+            self._release(worker)
+
+    def analyze_many(self, texts):
+        """
+        Split many texts into contiguous slices, one for each process in the
+        pool, and analyze the slices in parallel. The results come back in the
+        same order as the texts.
+        """
+        texts = list(texts)
+        nslices = min(self.size, len(texts))
+        if nslices <= 1:
+            worker = self._acquire()
+            try:
+                return worker.analyze_many(texts)
+            finally:
+                self._release(worker)
+
+        step = (len(texts) + nslices - 1) // nslices
+        slices = [texts[start:start + step]
+                  for start in range(0, len(texts), step)]
+        results = [None] * len(slices)
+        errors = []
+        failed = {}
+
+        def run_slice(index):
+            worker = self._acquire()
+            try:
+                results[index] = worker.analyze_many(slices[index])
+            except ProcessBatchError as e:
+                # Keep the results that the slice has
+                results[index] = e.results
+                for position, error in e.errors.items():
+                    failed[index * step + position] = error
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self._release(worker)
+
+        threads = [threading.Thread(target=run_slice, args=(index,))
+                   for index in range(len(slices))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        analyses = [analysis for part in results for analysis in part]
+        if failed:
+            raise ProcessBatchError(analyses, failed)
+        return analyses
+
+
 def unicode_is_punctuation(text):
     """
     Test if a token is made entirely of Unicode characters of the following
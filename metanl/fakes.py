@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+"""
+Stand-ins for the external programs that metanl runs -- MeCab, and
+FreeLing's `analyze` -- for benchmarking and testing on computers where they
+aren't installed.
+
+A stand-in speaks the same protocol over its standard input and output as
+the real program: it reads one line of text at a time, and answers with one
+line per token and a line that ends the block. Its analysis is trivial,
+though. Tokens are runs of word characters or single punctuation marks, and
+each one is its own lemma.
+
+Run one with `python -m metanl.fakes mecab` or `python -m metanl.fakes
+freeling`, or use FakeMeCabWrapper or FakeFreelingWrapper, which run them in
+place of the real programs.
+
+The stand-ins can also be made to misbehave, to see how wrappers cope with
+slow, verbose, or broken processes. Each of these is a command-line option,
+and a keyword argument of the fake wrappers:
+
+- `delay`: wait this many seconds before answering each line
+- `repeat`: write each token's line this many times, to make more output
+- `crash_on`: exit, without answering, on a line containing this text
+- `crash_after`: exit, without answering, on line number `crash_after + 1`
+- `hang_on`: stop responding forever on a line containing this text
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from metanl.mecab import MeCabWrapper
+from metanl.freeling import FreelingWrapper
+
+TOKEN_RE = re.compile(r'\w+|[^\w\s]', re.UNICODE)
+DETERMINERS = set('the a an el la los las un una le les der die das'.split())
+
+
+def _is_punctuation(token):
+    return unicodedata.category(token[0])[0] in 'PS'
+
+
+def mecab_block(text, repeat=1):
+    """
+    Get the lines of output that MeCab would write for a line of input: a
+    tab-separated surface form and feature list for each token, then 'EOS'.
+    """
+    lines = []
+    for token in TOKEN_RE.findall(text):
+        if _is_punctuation(token):
+            pos = '記号,一般'
+        else:
+            pos = '名詞,一般'
+        lines.extend(['%s\t%s,*,*,*,*,%s,*,*\n' % (token, pos, token)] *
+                     repeat)
+    lines.append('EOS\n')
+    return lines
+
+
+def freeling_block(text, repeat=1):
+    """
+    Get the lines of output that FreeLing would write for a line of input:
+    the token, lemma, tag, and probability of each token, separated by
+    spaces, and then a blank line.
+    """
+    lines = []
+    for token in TOKEN_RE.findall(text):
+        lemma = token.lower()
+        if _is_punctuation(token):
+            tag = 'Fp'
+        elif lemma in DETERMINERS:
+            tag = 'DT'
+        else:
+            tag = 'NN'
+        lines.extend(['%s %s %s 1\n' % (token, lemma, tag)] * repeat)
+    lines.append('\n')
+    return lines
+
+
+PROGRAMS = {
+    'mecab': mecab_block,
+    'freeling': freeling_block,
+}
+
+
+def serve(make_block, infile, outfile, delay=0, repeat=1, crash_on=None,
+          crash_after=None, hang_on=None):
+    """
+    Answer each line of `infile` with a block of output on `outfile`. Both
+    are binary files. The other arguments are described at the top of this
+    module.
+    """
+    for count, line in enumerate(iter(infile.readline, b'')):
+        text = line.decode('utf-8').rstrip('\n')
+        if ((crash_on is not None and crash_on in text) or
+                (crash_after is not None and count >= crash_after)):
+            # Exit right away, the way a crash would, without flushing or
+            # cleaning up anything.
+            os._exit(1)
+        if hang_on is not None and hang_on in text:
+            while True:
+                time.sleep(3600)
+        if delay:
+            time.sleep(delay)
+        outfile.write(''.join(make_block(text, repeat)).encode('utf-8'))
+        outfile.flush()
+
+
+def fake_command(program, delay=0, repeat=1, crash_on=None,
+                 crash_after=None, hang_on=None):
+    """
+    Get the command that runs the stand-in for `program`, with the given
+    ways of misbehaving.
+    """
+    command = [sys.executable, '-m', 'metanl.fakes', program]
+    if delay:
+        command += ['--delay', str(delay)]
+    if repeat != 1:
+        command += ['--repeat', str(repeat)]
+    if crash_on is not None:
+        command += ['--crash-on', crash_on]
+    if crash_after is not None:
+        command += ['--crash-after', str(crash_after)]
+    if hang_on is not None:
+        command += ['--hang-on', hang_on]
+    return command
+
+
+class FakeMeCabWrapper(MeCabWrapper):
+    """
+    A MeCabWrapper that runs the stand-in for MeCab. The keyword arguments
+    `delay`, `repeat`, `crash_on`, `crash_after`, and `hang_on` configure the
+    stand-in; any others are passed on to the MeCabWrapper.
+    """
+    def __init__(self, delay=0, repeat=1, crash_on=None, crash_after=None,
+                 hang_on=None, **kwargs):
+        MeCabWrapper.__init__(self, **kwargs)
+        self.fake_options = dict(delay=delay, repeat=repeat,
+                                 crash_on=crash_on, crash_after=crash_after,
+                                 hang_on=hang_on)
+
+    def _get_command(self):
+        return fake_command('mecab', **self.fake_options)
+
+
+class FakeFreelingWrapper(FreelingWrapper):
+    """
+    A FreelingWrapper that runs the stand-in for FreeLing, configured the
+    same way as a FakeMeCabWrapper.
+    """
+    def __init__(self, lang, delay=0, repeat=1, crash_on=None,
+                 crash_after=None, hang_on=None, **kwargs):
+        FreelingWrapper.__init__(self, lang, **kwargs)
+        self.fake_options = dict(delay=delay, repeat=repeat,
+                                 crash_on=crash_on, crash_after=crash_after,
+                                 hang_on=hang_on)
+
+    def _get_command(self):
+        return fake_command('freeling', **self.fake_options)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Imitate the input and output of an NLP program."
+    )
+    parser.add_argument('program', choices=sorted(PROGRAMS))
+    parser.add_argument('--delay', type=float, default=0,
+                        help='seconds to wait before answering each line')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='how many times to write each token\'s line')
+    parser.add_argument('--crash-on', metavar='TEXT',
+                        help='exit on a line containing this text')
+    parser.add_argument('--crash-after', type=int, metavar='N',
+                        help='exit after answering N lines')
+    parser.add_argument('--hang-on', metavar='TEXT',
+                        help='stop responding on a line containing this text')
+    args = parser.parse_args(argv)
+    serve(PROGRAMS[args.program],
+          getattr(sys.stdin, 'buffer', sys.stdin),
+          getattr(sys.stdout, 'buffer', sys.stdout),
+          delay=args.delay, repeat=args.repeat, crash_on=args.crash_on,
+          crash_after=args.crash_after, hang_on=args.hang_on)
+
+
+if __name__ == '__main__':
+    main()
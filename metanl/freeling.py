@@ -1,7 +1,15 @@
 from __future__ import unicode_literals
 
-import pkg_resources
-from metanl.extprocess import ProcessWrapper, ProcessError, render_safe
+from metanl.extprocess import ProcessWrapper, render_safe
+from collections import namedtuple
+
+# What FreeLing says about a token: the token itself, its lemma,
+# part-of-speech tag, and the probability of the tag, in the order FreeLing
+# gives them, so that code that indexes records as lists of those fields
+# still works. Then comes the lemma in lowercase, which is the root word that
+# metanl uses.
+FreelingRecord = namedtuple('FreelingRecord', ['token', 'lemma', 'pos',
+                                               'probability', 'root'])
 
 
 class FreelingWrapper(ProcessWrapper):
@@ -9,8 +17,9 @@ class FreelingWrapper(ProcessWrapper):
     Handle English, Spanish, Italian, Portuguese, or Welsh text by calling an
     installed copy of FreeLing.
 
-    The constructor takes one argument, which is the installed filename of the
-    language-specific config file, such as 'en.cfg'.
+    The constructor takes the code of the language to analyze, such as 'en',
+    which selects its config file from data/freeling. It also takes an
+    optional `cache` for results, as described in ProcessWrapper.
 
         >>> english.tag_and_stem("This is a test.\n\nIt has two paragraphs, and that's okay.")
         [('this', 'DT', 'This'), ('be', 'VBZ', 'is'), ('a', 'DT', 'a'), ('test', 'NN', 'test'), ('.', '.', '.'), ('it', 'PRP', 'It'), ('have', 'VBZ', 'has'), ('two', 'DT', 'two'), ('paragraph', 'NNS', 'paragraphs'), (',', '.', ','), ('and', 'CC', 'and'), ('that', 'PRP', 'that'), ('be', 'VBZ', "'s"), ('okay', 'JJ', 'okay'), ('.', '.', '.')]
@@ -19,13 +28,32 @@ class FreelingWrapper(ProcessWrapper):
         [('this', 'DT', 'this'), ('have', 'VBZ', 'has'), ('two', 'DT', 'two'), ('line', 'NNS', 'lines')]
 
     """
-    def __init__(self, lang):
+    # Each block of output ends with a blank line.
+    output_end = b'\n'
+
+    def __init__(self, lang, cache=None, timeout=None, restart_policy=None,
+                 stats=None):
+        ProcessWrapper.__init__(self, cache, timeout, restart_policy, stats)
         self.lang = lang
-        self.configfile = pkg_resources.resource_filename(
-            __name__, 'data/freeling/%s.cfg' % lang)
-        self.splitterfile = pkg_resources.resource_filename(
+
+    # pkg_resources is slow to import, so we look up the data files the
+    # first time the process is started, not when the module is imported.
+    @property
+    def configfile(self):
+        import pkg_resources
+        return pkg_resources.resource_filename(
+            __name__, 'data/freeling/%s.cfg' % self.lang)
+
+    @property
+    def splitterfile(self):
+        import pkg_resources
+        return pkg_resources.resource_filename(
             __name__, 'data/freeling/generic_splitter.dat')
 
+    @property
+    def cache_namespace(self):
+        return '%s:%s' % (self.__class__.__name__, self.lang)
+
     def _get_command(self):
         """
         Get the command for running the basic FreeLing pipeline in the
@@ -45,7 +73,7 @@ class FreelingWrapper(ProcessWrapper):
         """
         Given a FreeLing record, return the root word.
         """
-        return record[1].lower()
+        return record.root
 
     def get_record_token(self, record):
         """
@@ -73,35 +101,54 @@ class FreelingWrapper(ProcessWrapper):
         """
         return (record[2][0] == 'D')
 
-    def analyze(self, text):
-        """
-        Run text through the external process, and get a list of lists
-        ("records") that contain the analysis of each word.
-        """
-        try:
-            text = render_safe(text).strip()
-            if not text:
-                return []
-            chunks = text.split('\n')
-            results = []
-            for chunk_text in chunks:
-                if chunk_text.strip():
-                    textbytes = (chunk_text + '\n').encode('utf-8')
-                    self.send_input(textbytes)
-                    out_line = ''
-                    while True:
-                        out_line = self.receive_output_line()
-                        out_line = out_line.decode('utf-8')
-
-                        if out_line == '\n':
-                            break
-
-                        record = out_line.strip('\n').split(' ')
-                        results.append(record)
-            return results
-        except ProcessError:
-            self.restart_process()
-            return self.analyze(text)
+    def _get_input_lines(self, text):
+        """
+        Send each non-blank line of the text to FreeLing separately.
+        """
+        text = render_safe(text).strip()
+        return [(chunk_text + '\n').encode('utf-8')
+                for chunk_text in text.split('\n')
+                if chunk_text.strip()]
+
+    def _is_output_end(self, line):
+        return line == self.output_end
+
+    def _parse_output_line(self, line):
+        """
+        Turn a line of FreeLing output into a FreelingRecord.
+        """
+        return _make_record(line.strip('\n'))
+
+    def _parse_output_bytes(self, data):
+        """
+        Turn a block of FreeLing output into FreelingRecords, decoding it all
+        at once.
+        """
+        lines = data.decode('utf-8').split('\n')
+        # The block ends with a line break, so the last item is empty.
+        lines.pop()
+        return [_make_record(line) for line in lines]
+
+
+def _make_record(line):
+    """
+    Turn a line of FreeLing output, without its line break, into a
+    FreelingRecord.
+    """
+    parts = line.split(' ')
+    lemma = parts[1]
+    root = lemma.lower()
+    if root == lemma:
+        # Share the string instead of keeping two copies of it
+        root = lemma
+    if len(parts) > 3:
+        probability = parts[3]
+    else:
+        probability = None
+    return _new_record((parts[0], lemma, parts[2], probability, root))
+
+
+_new_record = FreelingRecord._make
 
 
 LANGUAGES = {}
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+"""
+Read the word frequency lists from the Leeds Internet Corpora, such as the
+ones in metanl/data/source-data.
+
+A list has a few lines of header, which say how big the corpus is, and then
+one line for each word: its rank, its frequency, and the word itself, which
+may contain spaces. Some lists are wrapped in HTML, which is skipped.
+
+    1 54128.31 de
+    2 31725.44 la
+    ...
+    219 280.89 ya que
+
+A FrequencyList reads a list through a memory map, and indexes it with a
+few compact arrays instead of a dictionary of Python strings, so that it
+costs little memory and words can be looked up in constant time.
+
+translate_leeds_corpus() makes a list of lemma frequencies out of a list of
+word forms, by normalizing each word and adding up the frequencies of the
+words that have the same normalized form.
+
+    >>> spanish = FrequencyList(source_data_path('internet-es'))
+    >>> spanish.frequency('la')
+    31725.44
+    >>> spanish.rank('ya que')
+    219
+"""
+
+import argparse
+import io
+import itertools
+import mmap
+import os
+import re
+from array import array
+from collections import defaultdict
+import sys
+if sys.version_info.major == 2:
+    from HTMLParser import HTMLParser
+    unescape = HTMLParser().unescape
+    range = xrange
+    replace_file = os.rename
+else:
+    from html import unescape
+    # Unlike os.rename, this replaces an existing file on Windows too.
+    replace_file = os.replace
+
+SOURCE_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data',
+                               'source-data')
+
+# An entry is a rank, a frequency, and the rest of the line, separated by
+# single spaces. The rest of the line is the word, even if it's made of
+# strange characters, so that entries keep the same ranks as in the file.
+ENTRY_RE = re.compile(br'^(\d+) (\d+(?:\.\d*)?) ([^\r\n]*?)\r?$',
+                      re.MULTILINE)
+CORPUS_SIZE_RE = re.compile(br'corpus size: (\d+) tokens')
+LEXICON_SIZE_RE = re.compile(br'lexicon size: (\d+) types')
+ATTRIBUTE_RE = re.compile(br"frequency distribution for attribute '(\w+)'")
+
+
+def source_data_path(name):
+    """
+    Get the path of one of the frequency lists that come with metanl, by
+    the name of its corpus, such as 'internet-ja' or 'rnc-modern'.
+    """
+    for filename in (name + '-forms.num', name + '.num', name + '.num.html'):
+        path = os.path.join(SOURCE_DATA_DIR, filename)
+        if os.path.exists(path):
+            return path
+    raise KeyError("There's no frequency list named %r." % name)
+
+
+def _header_number(regex, data):
+    match = regex.search(data, 0, _header_end(data))
+    if match is None:
+        return None
+    return int(match.group(1))
+
+
+def _header_end(data):
+    """
+    Find where the first entry starts, or the end of the data if there are
+    no entries.
+    """
+    match = ENTRY_RE.search(data)
+    if match is None:
+        return len(data)
+    return match.start()
+
+
+def _decode_word(word_bytes, is_html):
+    word = word_bytes.decode('utf-8')
+    if is_html and '&' in word:
+        word = unescape(word)
+    return word
+
+
+def _map_file(filename):
+    with open(filename, 'rb') as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def iter_entries(filename):
+    """
+    Read the (rank, frequency, word) entries of a frequency list one at a
+    time, without indexing or loading the whole list.
+    """
+    data = _map_file(filename)
+    is_html = filename.endswith('.html')
+    for match in ENTRY_RE.finditer(data):
+        yield (int(match.group(1)), float(match.group(2)),
+               _decode_word(match.group(3), is_html))
+
+
+class FrequencyList(object):
+    """
+    A Leeds frequency list, memory-mapped and indexed.
+
+    Entries are numbered from 1, in the order they appear in the file, which
+    is the order of their ranks. The index consists of:
+
+    - the byte offsets where each word starts and ends in the file
+    - an array of the frequency of each entry
+    - an open-addressing hash table, mapping the hash of a word's UTF-8 bytes
+      to its entry number
+
+    If a word appears more than once, the first (highest-ranked) entry is the
+    one that's looked up.
+
+    Attributes from the header, where they're present, are `corpus_size` (in
+    tokens), `lexicon_size` (in types), and `attribute`, which says whether
+    the list counts word forms ('word') or lemmas ('lemma').
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._data = _map_file(filename)
+        self._is_html = filename.endswith('.html')
+        data = self._data
+
+        self.corpus_size = _header_number(CORPUS_SIZE_RE, data)
+        self.lexicon_size = _header_number(LEXICON_SIZE_RE, data)
+        match = ATTRIBUTE_RE.search(data, 0, _header_end(data))
+        self.attribute = match and match.group(1).decode('ascii')
+
+        self._starts = array('I')
+        self._ends = array('I')
+        self._freqs = array('d')
+        hashes = []
+        for match in ENTRY_RE.finditer(data):
+            self._starts.append(match.start(3))
+            self._ends.append(match.end(3))
+            self._freqs.append(float(match.group(2)))
+            hashes.append(hash(match.group(3)))
+        self._build_table(hashes)
+
+    def _build_table(self, hashes):
+        # Keep the table at most half full, so probes are short.
+        size = 8
+        while size < len(hashes) * 2:
+            size *= 2
+        self._mask = size - 1
+        table = array('i', [0]) * size
+        mask = self._mask
+        for index, hashed in enumerate(hashes):
+            slot = hashed & mask
+            while table[slot]:
+                slot = (slot + 1) & mask
+            table[slot] = index + 1
+        self._table = table
+
+    def _word_bytes(self, index):
+        return self._data[self._starts[index]:self._ends[index]]
+
+    def _find(self, word):
+        """
+        Get the index of a word's entry, or -1 if it isn't in the list.
+        """
+        key = word.encode('utf-8')
+        table = self._table
+        mask = self._mask
+        slot = hash(key) & mask
+        while True:
+            entry = table[slot]
+            if not entry:
+                return -1
+            if self._word_bytes(entry - 1) == key:
+                return entry - 1
+            slot = (slot + 1) & mask
+
+    def __len__(self):
+        return len(self._freqs)
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def frequency(self, word, default=0):
+        """
+        Get the frequency of a word, as given in the list, or `default` if
+        it isn't there.
+        """
+        index = self._find(word)
+        if index < 0:
+            return default
+        return self._freqs[index]
+
+    def rank(self, word):
+        """
+        Get the rank of a word, counting from 1, or None if it isn't in the
+        list.
+        """
+        index = self._find(word)
+        if index < 0:
+            return None
+        return index + 1
+
+    def word(self, rank):
+        """
+        Get the word at a given rank.
+        """
+        if not 1 <= rank <= len(self):
+            raise IndexError("rank out of range: %r" % rank)
+        return _decode_word(self._word_bytes(rank - 1), self._is_html)
+
+    def entry(self, rank):
+        """
+        Get the (rank, frequency, word) entry at a given rank.
+        """
+        return (rank, self._freqs[rank - 1], self.word(rank))
+
+    def __iter__(self):
+        """
+        Iterate over the (rank, frequency, word) entries, in order.
+        """
+        for index in range(len(self)):
+            yield (index + 1, self._freqs[index],
+                   _decode_word(self._word_bytes(index), self._is_html))
+
+    def words(self):
+        """
+        Iterate over the words, most frequent first.
+        """
+        for index in range(len(self)):
+            yield _decode_word(self._word_bytes(index), self._is_html)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _batch_normalizer(normalizer, pool):
+    """
+    Get a function that normalizes a list of words, given a `normalizer`
+    that's either a function of one word or an analyzer with a `normalize`
+    method.
+    """
+    if hasattr(normalizer, 'normalize_many'):
+        from metanl.extprocess import ProcessBatchError
+
+        def normalize_many(words):
+            try:
+                return normalizer.normalize_many(words)
+            except ProcessBatchError as e:
+                # Words that the process kept failing on normalize to
+                # nothing, so that one bad word can't stop the job.
+                return [norm or '' for norm in e.results]
+        return normalize_many
+    if hasattr(normalizer, 'normalize'):
+        normalizer = normalizer.normalize
+    if pool is None:
+        return lambda words: [normalizer(word) for word in words]
+    return lambda words: pool.map(normalizer, words, chunksize=100)
+
+
+def _format_frequency(freq):
+    return ('%.3f' % freq).rstrip('0').rstrip('.')
+
+
+def _checkpoint_header(infile):
+    stat = os.stat(infile)
+    return '#translate_leeds_corpus\t%s\t%d\t%d\n' % (
+        os.path.basename(infile), stat.st_size, int(stat.st_mtime)
+    )
+
+
+def _read_checkpoint(filename, header):
+    """
+    Read the (rank, frequency, normalized word) entries that a previous run
+    finished, from a checkpoint file whose first line is `header`. Any
+    partly written line at the end is ignored.
+    """
+    entries = []
+    if not os.path.exists(filename):
+        return entries
+    with io.open(filename, encoding='utf-8', newline='\n') as infile:
+        if infile.readline() != header:
+            # The checkpoint is from a different source file.
+            return entries
+        for line in infile:
+            if not line.endswith('\n'):
+                break
+            rank, freq, word = line[:-1].split('\t', 2)
+            entries.append((int(rank), float(freq), word))
+    return entries
+
+
+def translate_leeds_corpus(infile, outfile, normalizer, processes=1,
+                           batch_size=1000, resume=True, progress=None):
+    """
+    Read the Leeds frequency list `infile`, normalize each of its words with
+    `normalizer`, and write the normalized words with their total
+    frequencies to `outfile`, one 'word,frequency' line each, most frequent
+    first. Words that normalize to nothing are left out.
+
+    `normalizer` can be:
+
+    - a function of one word, such as metanl.nltk_morphy.normalize
+    - an analyzer with a `normalize` method, such as a FreelingWrapper
+    - the name of an analyzer, as understood by metanl.pipeline.get_analyzer
+
+    Analyzers that have a `normalize_many` method, such as ProcessWrappers,
+    are given a batch of words at a time; use a ProcessPool to run several
+    processes. An analyzer given by name gets a ProcessPool of `processes`
+    processes when it runs an external program. Otherwise, if `processes`
+    is more than 1, the words are divided among a multiprocessing pool,
+    which requires the normalizer to be a function that can be pickled.
+    Words that an analyzer's process keeps failing on, even after restarting
+    it, are treated as normalizing to nothing.
+
+    Words are normalized `batch_size` at a time. After each batch, the
+    results so far are saved to a checkpoint file, `outfile` + '.partial',
+    so if the job is interrupted, running it again with `resume=True` picks
+    up where it left off. `progress`, if given, is called after each batch
+    with the number of words done and the total number of words.
+    """
+    if isinstance(normalizer, (type(''), str)):
+        from metanl.pipeline import get_analyzer
+        normalizer = get_analyzer(normalizer, processes=processes)
+
+    checkpoint = outfile + '.partial'
+    header = _checkpoint_header(infile)
+    finished = _read_checkpoint(checkpoint, header) if resume else []
+    done = finished[-1][0] if finished else 0
+
+    counts = defaultdict(float)
+    for rank, freq, word in finished:
+        if word:
+            counts[word] += freq
+
+    pool = None
+    if processes > 1 and not hasattr(normalizer, 'normalize_many'):
+        import multiprocessing
+        pool = multiprocessing.Pool(processes)
+    try:
+        normalize_batch = _batch_normalizer(normalizer, pool)
+        with FrequencyList(infile) as freqs:
+            total = len(freqs)
+            entries = itertools.islice(iter(freqs), done, None)
+            # Rewrite the checkpoint with only its complete lines, and then
+            # add to it.
+            with io.open(checkpoint, 'w', encoding='utf-8',
+                         newline='\n') as out:
+                out.write(header)
+                for rank, freq, word in finished:
+                    out.write('%d\t%r\t%s\n' % (rank, freq, word))
+                while True:
+                    batch = list(itertools.islice(entries, batch_size))
+                    if not batch:
+                        break
+                    normalized = normalize_batch([word for rank, freq, word
+                                                  in batch])
+                    for (rank, freq, word), norm in zip(batch, normalized):
+                        # Tabs and line breaks would break the checkpoint
+                        # and output formats.
+                        norm = ' '.join(norm.split())
+                        out.write('%d\t%r\t%s\n' % (rank, freq, norm))
+                        if norm:
+                            counts[norm] += freq
+                    out.flush()
+                    done = batch[-1][0]
+                    if progress is not None:
+                        progress(done, total)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    tmp_outfile = outfile + '.tmp'
+    with io.open(tmp_outfile, 'w', encoding='utf-8') as out:
+        for word, freq in sorted(counts.items(),
+                                 key=lambda item: (-item[1], item[0])):
+            out.write('%s,%s\n' % (word, _format_frequency(freq)))
+    replace_file(tmp_outfile, outfile)
+    os.remove(checkpoint)
+
+
+def _print_progress(done, total):
+    sys.stderr.write('\r%d/%d words' % (done, total))
+    if done == total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Make a list of lemma frequencies from a Leeds frequency "
+                    "list, by normalizing its words."
+    )
+    parser.add_argument('infile', help='a Leeds frequency list')
+    parser.add_argument('outfile', help="where to write 'word,frequency' "
+                                        "lines")
+    parser.add_argument('--analyzer', default='nltk',
+                        help="'nltk', 'mecab', or 'freeling-xx' for the "
+                             "language code xx")
+    parser.add_argument('--processes', type=int, default=1,
+                        help='how many processes to normalize words in')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--restart', action='store_true',
+                        help="start over instead of resuming from a "
+                             "checkpoint")
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.analyzer == 'nltk':
+        # A plain function, which a multiprocessing pool can run
+        from metanl.nltk_morphy import normalize as normalizer
+    else:
+        from metanl.pipeline import get_analyzer
+        normalizer = get_analyzer(args.analyzer, processes=args.processes)
+    translate_leeds_corpus(
+        args.infile, args.outfile, normalizer, processes=args.processes,
+        batch_size=args.batch_size, resume=not args.restart,
+        progress=None if args.quiet else _print_progress
+    )
+
+
+if __name__ == '__main__':
+    main()
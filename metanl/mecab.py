@@ -22,6 +22,7 @@ import re
 import sys
 if sys.version_info.major == 2:
     range = xrange
+    chr = unichr
     str_func = unicode
 else:
     str_func = str
@@ -98,6 +99,9 @@ class MeCabWrapper(ProcessWrapper):
     additional dependencies. Using this tool for Japanese requires only
     MeCab to be installed and accepting UTF-8 text.
     """
+    # Each block of output ends with this line.
+    output_end = b'EOS\n'
+
     def _get_command(self):
         return ['mecab']
 
@@ -122,42 +126,36 @@ class MeCabWrapper(ProcessWrapper):
     def get_record_token(self, record):
         return record.surface
 
-    def analyze(self, text):
+    def _get_input_lines(self, text):
         """
-        Runs a line of text through MeCab, and returns the results as a
-        list of lists ("records") that contain the MeCab analysis of each
-        word.
+        MeCab can only handle lines of a limited length, so break the text
+        into pieces that it can handle, one line each.
         """
-        try:
-            self.process  # make sure things are loaded
-            text = render_safe(text).replace('\n', ' ').lower()
-            results = []
-            for chunk in string_pieces(text):
-                self.send_input((chunk + '\n').encode('utf-8'))
-                while True:
-                    out_line = self.receive_output_line().decode('utf-8')
-                    if out_line == 'EOS\n':
-                        break
-
-                    word, info = out_line.strip('\n').split('\t')
-                    record_parts = [word] + info.split(',')
-
-                    # Pad the record out to have 10 parts if it doesn't
-                    record_parts += [None] * (10 - len(record_parts))
-                    record = MeCabRecord(*record_parts)
-
-                    # special case for detecting nai -> n
-                    if (record.surface == 'ん' and
-                        record.conjugation == '不変化型'):
-                        # rebuild the record so that record.root is 'nai'
-                        record_parts[MeCabRecord._fields.index('root')] = 'ない'
-                        record = MeCabRecord(*record_parts)
-
-                    results.append(record)
-            return results
-        except ProcessError:
-            self.restart_process()
-            return self.analyze(text)
+        text = render_safe(text).replace('\n', ' ').lower()
+        return [(chunk + '\n').encode('utf-8')
+                for chunk in string_pieces(text)]
+
+    def _is_output_end(self, line):
+        return line == self.output_end
+
+    def _parse_output_line(self, line):
+        """
+        Turn a line of MeCab output into a MeCabRecord.
+        """
+        return _make_record(line.strip('\n'))
+
+    def _parse_output_block(self, lines):
+        return self._parse_output_bytes(b''.join(lines))
+
+    def _parse_output_bytes(self, data):
+        """
+        Turn a block of MeCab output into MeCabRecords, decoding it all at
+        once.
+        """
+        lines = data.decode('utf-8').split('\n')
+        # The block ends with a line break, so the last item is empty.
+        lines.pop()
+        return [_make_record(line) for line in lines]
 
     def is_stopword_record(self, record):
         """
@@ -191,6 +189,30 @@ class MeCabWrapper(ProcessWrapper):
             return record.pos
 
 
+def _make_record(line):
+    """
+    Turn a line of MeCab output, without its line break, into a MeCabRecord.
+    """
+    word, info = line.split('\t')
+    record_parts = info.split(',')
+    record_parts.insert(0, word)
+
+    # Pad the record out to have 10 parts if it doesn't
+    if len(record_parts) < 10:
+        record_parts += [None] * (10 - len(record_parts))
+
+    # special case for detecting nai -> n: make record.root 'nai'
+    if word == 'ん' and record_parts[_CONJUGATION] == '不変化型':
+        record_parts[_ROOT] = 'ない'
+
+    return _new_record(record_parts)
+
+
+_CONJUGATION = MeCabRecord._fields.index('conjugation')
+_ROOT = MeCabRecord._fields.index('root')
+_new_record = MeCabRecord._make
+
+
 class NoStopwordMeCabWrapper(MeCabWrapper):
     """
     This version of the MeCabWrapper doesn't label anything as a stopword. It's
@@ -210,7 +232,29 @@ def to_kana(text):
     Use MeCab to turn any text into its phonetic spelling, as katakana
     separated by spaces.
     """
-    records = MECAB.analyze(text)
+    return records_to_kana(MECAB.analyze(text))
+
+
+def to_kana_many(texts):
+    """
+    Get the result of :func:`to_kana` for each of a list of texts, using
+    MeCab's analyze_many to send them to MeCab in batches. Each different
+    text is only analyzed once.
+    """
+    texts = list(texts)
+    unique_texts = list(set(texts))
+    kana = dict(zip(unique_texts,
+                    [records_to_kana(records)
+                     for records in MECAB.analyze_many(unique_texts)]))
+    return [kana[text] for text in texts]
+
+
+def records_to_kana(records):
+    """
+    Get the phonetic spelling of some text, as katakana separated by spaces,
+    from the MeCabRecords that MeCab's analysis of it returned. Use this
+    instead of to_kana when you've already analyzed the text.
+    """
     kana = []
     for record in records:
         if record.pronunciation:
@@ -274,16 +318,73 @@ def respell_hepburn(syllable):
     return syllable
 
 
+# Pieces of romanized text come from a small set of syllables, so their
+# Hepburn spellings are worth remembering. There's a limit on how many, in
+# case the text is full of unusual characters.
+_HEPBURN_CACHE = {}
+_HEPBURN_CACHE_SIZE = 10000
+
+
+def _respell_hepburn_cached(syllable):
+    respelled = _HEPBURN_CACHE.get(syllable)
+    if respelled is None:
+        respelled = respell_hepburn(syllable)
+        if len(_HEPBURN_CACHE) < _HEPBURN_CACHE_SIZE:
+            _HEPBURN_CACHE[syllable] = respelled
+    return respelled
+
+
 def romanize(text, respell=respell_hepburn):
+    """
+    Use MeCab to spell any text in Roman characters.
+
+    `respell` is a function that changes the spelling of each romanized
+    syllable, such as respell_hepburn, or None to leave them spelled the way
+    they're written in kana.
+    """
+    return romanize_kana(to_kana(str_func(text)), respell)
+
+
+def romanize_many(texts, respell=respell_hepburn):
+    """
+    Get the result of :func:`romanize` for each of a list of texts, sending
+    them to MeCab in batches.
+    """
+    return [romanize_kana(kana, respell)
+            for kana in to_kana_many([str_func(text) for text in texts])]
+
+
+def romanize_records(records, respell=respell_hepburn):
+    """
+    Spell some text in Roman characters, given the MeCabRecords that MeCab's
+    analysis of it returned.
+    """
+    return romanize_kana(records_to_kana(records), respell)
+
+
+def romanize_kana(kana, respell=respell_hepburn):
+    """
+    Spell text that's written in kana, such as the output of to_kana(), in
+    Roman characters. This is how romanize() works once MeCab has found the
+    pronunciation of the text.
+
+    Characters are looked up in KANA_TABLE, in one pass over the text.
+    """
     if respell is None:
         respell = lambda x: x
+    elif respell is respell_hepburn:
+        respell = _respell_hepburn_cached
 
-    kana = to_kana(str_func(text))
+    lookup = KANA_TABLE.get
     pieces = []
     prevgroup = NOT_KANA
 
     for char in kana:
-        roman, group = get_kana_info(char)
+        info = lookup(char)
+        if info is None:
+            roman, group = char, NOT_KANA
+        else:
+            roman, group = info
         if prevgroup == NN:
             # When the previous syllable is 'n' and the next syllable would
             # make it ambiguous, add an apostrophe.
@@ -335,11 +436,14 @@ def romanize(text, respell=respell_hepburn):
             pieces.append(roman)
         prevgroup = group
 
-    romantext = ''.join(respell(piece) for piece in pieces)
-    romantext = re.sub(r'[aeiou]x([aeiou])', r'\1', romantext)
+    romantext = ''.join([respell(piece) for piece in pieces])
+    romantext = SMALL_VOWEL_RE.sub(r'\1', romantext)
     return romantext
 
 
+SMALL_VOWEL_RE = re.compile(r'[aeiou]x([aeiou])')
+
+
 # Hepburn romanization is the most familiar to English speakers. It involves
 # respelling certain parts of romanized words to better match their
 # pronunciation. For example, the name for Mount Fuji is respelled from
@@ -375,6 +479,35 @@ ROMAN_PUNCTUATION_TABLE = {
     '〜': '~'
 }
 
+
+
+def _build_kana_table():
+    """
+    Get the result of get_kana_info() for every character where it isn't
+    just the character itself: the kana, which are in the Hiragana,
+    Katakana, and Katakana Phonetic Extensions blocks and the blocks of
+    kana from U+1AFF0 to U+1B16F, and the punctuation in
+    ROMAN_PUNCTUATION_TABLE.
+    """
+    codepoints = list(range(0x3040, 0x3100)) + list(range(0x31f0, 0x3200))
+    codepoints += list(range(0x1aff0, 0x1b170))
+    table = {}
+    for codepoint in codepoints:
+        try:
+            char = chr(codepoint)
+        except ValueError:
+            # A "narrow" build of Python 2 can't represent characters
+            # outside the Basic Multilingual Plane as single characters.
+            continue
+        info = get_kana_info(char)
+        if info != (char, NOT_KANA):
+            table[char] = info
+    for char in ROMAN_PUNCTUATION_TABLE:
+        table[char] = get_kana_info(char)
+    return table
+
+KANA_TABLE = _build_kana_table()
+
 # Provide externally available functions.
 MECAB = MeCabWrapper()
 
@@ -385,3 +518,4 @@ tokenize_list = MECAB.tokenize_list
 analyze = MECAB.analyze
 tag_and_stem = MECAB.tag_and_stem
 is_stopword = MECAB.is_stopword
+warmup = MECAB.warmup
@@ -1,16 +1,88 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, unicode_literals
 
-import nltk
-from nltk.corpus import wordnet
 from metanl.token_utils import untokenize, tokenize
+from metanl.cache import LRUCache
+import io
+import itertools
 import re
 
-try:
-    morphy = wordnet._morphy
-except LookupError:
-    nltk.download('wordnet')
-    morphy = wordnet._morphy
+# NLTK and its WordNet data are slow to load, so we don't load them until the
+# first time they're needed, or until warmup() is called.
+_morphy = None
+_tagger = None
+
+
+def _get_morphy():
+    """
+    Get WordNet's Morphy function, loading WordNet if necessary.
+    """
+    global _morphy
+    if _morphy is None:
+        from nltk.corpus import wordnet
+        try:
+            _morphy = wordnet._morphy
+        except LookupError:
+            import nltk
+            nltk.download('wordnet')
+            _morphy = wordnet._morphy
+    return _morphy
+
+
+def _get_tagger():
+    """
+    Get the part-of-speech tagger that `nltk.pos_tag` uses, loading it once
+    and keeping it, so that it isn't loaded again for every text we tag.
+    """
+    global _tagger
+    if _tagger is None:
+        try:
+            from nltk.tag.perceptron import PerceptronTagger
+            _tagger = PerceptronTagger()
+        except ImportError:
+            # Older versions of NLTK use a pickled tagger.
+            import nltk
+            from nltk.tag import _POS_TAGGER
+            _tagger = nltk.data.load(_POS_TAGGER)
+    return _tagger
+
+
+def morphy(word, pos):
+    """
+    Run WordNet's Morphy on a word, in a given WordNet part of speech.
+    """
+    return _get_morphy()(word, pos)
+
+
+# A metanl.stats.Stats object that measures the time spent tokenizing,
+# tagging, and stemming, and how often stems are found without running
+# Morphy. It's None, measuring nothing, unless set_stats() is called.
+STATS = None
+
+
+def set_stats(stats):
+    """
+    Measure this module's work with a metanl.stats.Stats object, or stop
+    measuring it if `stats` is None. The measurements are named
+    'nltk_morphy.tokenize', 'nltk_morphy.tag', 'nltk_morphy.stem',
+    'nltk_morphy.morphy', 'nltk_morphy.lemma_table_hits', and
+    'nltk_morphy.stem_cache_hits'.
+
+    Work done in the processes of a multiprocessing pool is measured in
+    those processes, not this one.
+    """
+    global STATS
+    STATS = stats
+
+
+def warmup():
+    """
+    Load everything that this module loads lazily: NLTK, WordNet, and the
+    models for tokenizing and tagging. Long-running processes can call this
+    at startup, so that their first request isn't slow.
+    """
+    _get_morphy()
+    tag_and_stem('Warming up.')
 
 STOPWORDS = ['the', 'a', 'an']
 
@@ -108,6 +180,7 @@ def _morphy_best(word, pos=None):
     results = []
     if pos is None:
         pos = 'nvar'
+    morphy = _get_morphy()
     for pos_item in pos:
         results.extend(morphy(word, pos_item))
     if not results:
@@ -116,6 +189,43 @@ def _morphy_best(word, pos=None):
     return results[0]
 
 
+# Stems that have already been computed, keyed by (word, pos) after the word
+# has been lowercased and the part of speech has been simplified. The lemma
+# table is loaded from a file by load_lemma_table(), while the stem cache
+# fills up as words are stemmed.
+LEMMA_TABLE = {}
+STEM_CACHE = LRUCache(100000)
+
+# The parts of speech that are worth storing in a lemma table; other parts of
+# speech are simplified to None.
+LEMMA_TABLE_POS = (None, 'n', 'v', 'a', 'r')
+
+
+def set_stem_cache_size(size):
+    """
+    Replace the cache of recently computed stems with an empty one that holds
+    `size` stems. A size of 0 turns off the cache.
+    """
+    global STEM_CACHE
+    if size:
+        STEM_CACHE = LRUCache(size)
+    else:
+        STEM_CACHE = None
+
+
+def _morphy_stem_uncached(word, pos):
+    """
+    Get the stem for a word that has been pre-processed by morphy_stem(),
+    without looking in any caches.
+    """
+    if word in EXCEPTIONS:
+        return EXCEPTIONS[word]
+    if pos is None:
+        if word in AMBIGUOUS_EXCEPTIONS:
+            return AMBIGUOUS_EXCEPTIONS[word]
+    return _morphy_best(word, pos) or word
+
+
 def morphy_stem(word, pos=None):
     """
     Get the most likely stem for a word. If a part of speech is supplied,
@@ -129,6 +239,10 @@ def morphy_stem(word, pos=None):
     - 'r' or 'RB' for adverbs
 
     Any other part of speech will be treated as unknown.
+
+    Words that appear in the LEMMA_TABLE are looked up there. Other words
+    are stemmed using Morphy, and the results are remembered in the
+    STEM_CACHE.
     """
     word = word.lower()
     if pos is not None:
@@ -144,12 +258,69 @@ def morphy_stem(word, pos=None):
         pos = 'v'
     if pos is not None and pos not in 'nvar':
         pos = None
-    if word in EXCEPTIONS:
-        return EXCEPTIONS[word]
-    if pos is None:
-        if word in AMBIGUOUS_EXCEPTIONS:
-            return AMBIGUOUS_EXCEPTIONS[word]
-    return _morphy_best(word, pos) or word
+
+    key = (word, pos)
+    stem = LEMMA_TABLE.get(key)
+    if stem is not None:
+        if STATS is not None:
+            STATS.count('nltk_morphy.lemma_table_hits')
+        return stem
+    cache = STEM_CACHE
+    if cache is None:
+        return _compute_stem(word, pos)
+    stem = cache.get(key)
+    if stem is None:
+        stem = _compute_stem(word, pos)
+        cache[key] = stem
+    elif STATS is not None:
+        STATS.count('nltk_morphy.stem_cache_hits')
+    return stem
+
+
+def _compute_stem(word, pos):
+    """
+    Run _morphy_stem_uncached(), timing it if we're collecting stats.
+    """
+    stats = STATS
+    if stats is None:
+        return _morphy_stem_uncached(word, pos)
+    start = stats.clock()
+    stem = _morphy_stem_uncached(word, pos)
+    stats.record_time('nltk_morphy.morphy', stats.clock() - start)
+    return stem
+
+
+def build_lemma_table(words, filename, limit=None):
+    """
+    Precompute the stems of a vocabulary of words, in each part of speech, and
+    save them in a file that load_lemma_table() can load.
+
+    `words` should be an iterable of words, most frequent first, such as the
+    words of a frequency list; `limit` can be set to keep only the first
+    `limit` of them. The file has one tab-separated line of `word`, `pos`,
+    and `stem` for each combination of word and part of speech.
+    """
+    with io.open(filename, 'w', encoding='utf-8') as out:
+        seen = set()
+        for word in itertools.islice(words, limit):
+            word = word.lower()
+            if word in seen or '\t' in word or '\n' in word:
+                continue
+            seen.add(word)
+            for pos in LEMMA_TABLE_POS:
+                stem = _morphy_stem_uncached(word, pos)
+                out.write('%s\t%s\t%s\n' % (word, pos or '', stem))
+
+
+def load_lemma_table(filename):
+    """
+    Load a file created by build_lemma_table() into the LEMMA_TABLE, so that
+    the words in it can be stemmed without consulting WordNet.
+    """
+    with io.open(filename, encoding='utf-8') as infile:
+        for line in infile:
+            word, pos, stem = line.rstrip('\n').split('\t')
+            LEMMA_TABLE[(word, pos or None)] = stem
 
 
 def tag_and_stem(text):
@@ -160,13 +331,71 @@ def tag_and_stem(text):
     - tag: the word's part of speech
     - token: the original word, so we can reconstruct it later
     """
+    stats = STATS
+    if stats is None:
+        return _stem_tagged(_get_tagger().tag(tokenize(text)))
+    start = stats.clock()
     tokens = tokenize(text)
-    tagged = nltk.pos_tag(tokens)
-    out = []
-    for token, tag in tagged:
-        stem = morphy_stem(token, tag)
-        out.append((stem, tag, token))
-    return out
+    tokenized = stats.clock()
+    tagged = _get_tagger().tag(tokens)
+    tagged_time = stats.clock()
+    result = _stem_tagged(tagged)
+    _record_steps(stats, start, tokenized, tagged_time, stats.clock())
+    return result
+
+
+def _record_steps(stats, start, tokenized, tagged, stemmed):
+    """
+    Record how long each step of tagging and stemming took, given the times
+    when each one finished.
+    """
+    stats.record_time('nltk_morphy.tokenize', tokenized - start)
+    stats.record_time('nltk_morphy.tag', tagged - tokenized)
+    stats.record_time('nltk_morphy.stem', stemmed - tagged)
+
+
+def _stem_tagged(tagged):
+    return [(morphy_stem(token, tag), tag, token) for token, tag in tagged]
+
+
+def _map_in_pool(func, texts, pool, chunk_size=100):
+    """
+    Apply a function that takes a list of texts, such as tag_and_stem_many,
+    to chunks of `texts` in a multiprocessing pool, and concatenate the
+    results in order.
+    """
+    chunks = [texts[start:start + chunk_size]
+              for start in range(0, len(texts), chunk_size)]
+    return [result for chunk_results in pool.map(func, chunks)
+            for result in chunk_results]
+
+
+def tag_and_stem_many(texts, pool=None):
+    """
+    Get the result of tag_and_stem() for each of many texts.
+
+    NLTK's tagger tags one sentence at a time, so the texts are not tagged
+    together; each is tagged by the same loaded tagger that tag_and_stem()
+    uses, and its words are stemmed through the same shared stem cache. The
+    way to go faster is `pool`: if it's a multiprocessing pool, the texts
+    are divided among its processes.
+    """
+    texts = list(texts)
+    if pool is not None:
+        return _map_in_pool(tag_and_stem_many, texts, pool)
+    stats = STATS
+    if stats is not None:
+        start = stats.clock()
+    token_lists = [tokenize(text) for text in texts]
+    if stats is not None:
+        tokenized = stats.clock()
+    tagged_lists = _get_tagger().tag_sents(token_lists)
+    if stats is not None:
+        tagged_time = stats.clock()
+    result = [_stem_tagged(tagged) for tagged in tagged_lists]
+    if stats is not None:
+        _record_steps(stats, start, tokenized, tagged_time, stats.clock())
+    return result
 
 
 def good_lemma(lemma):
@@ -194,6 +423,17 @@ def normalize_list(text):
     return pieces
 
 
+def normalize_list_many(texts, pool=None):
+    """
+    Get the result of normalize_list() for each of many texts. If `pool` is a
+    multiprocessing pool, the texts are divided among its processes.
+    """
+    texts = list(texts)
+    if pool is not None:
+        return _map_in_pool(normalize_list_many, texts, pool)
+    return [normalize_list(text) for text in texts]
+
+
 def normalize(text):
     """
     Get a string made from the non-stopword word stems in the text. See
@@ -0,0 +1,143 @@
+from __future__ import unicode_literals
+"""
+Normalize text that's too big to hold in memory, such as a corpus with one
+document per line.
+
+The functions here read their input lazily, send it to an analyzer in
+batches, and produce results one at a time, in the same order as the input.
+Only one batch is in memory at a time, however large the input is.
+
+An analyzer can be:
+
+- the metanl.nltk_morphy module, for English
+- a ProcessWrapper, such as metanl.mecab.MECAB, one of the FreelingWrappers
+  in metanl.freeling.LANGUAGES, or a ProcessPool of them
+- the name of one of these, as understood by get_analyzer()
+"""
+
+import functools
+import io
+import itertools
+import json
+import sys
+if sys.version_info.major == 2:
+    str_func = unicode
+else:
+    str_func = str
+
+
+def get_analyzer(name, processes=1):
+    """
+    Get an analyzer by name:
+
+    - 'nltk' is the metanl.nltk_morphy module
+    - 'mecab' is metanl.mecab.MECAB
+    - 'freeling-xx' is the FreelingWrapper for the language code 'xx'
+
+    If `processes` is more than 1, the MeCab and FreeLing analyzers are
+    instead new ProcessPools that run that many copies of the process.
+    """
+    if name == 'nltk':
+        from metanl import nltk_morphy
+        return nltk_morphy
+    elif name == 'mecab':
+        from metanl.mecab import MECAB, MeCabWrapper
+        if processes > 1:
+            return _pool(MeCabWrapper, processes)
+        return MECAB
+    elif name.startswith('freeling-'):
+        from metanl.freeling import LANGUAGES, FreelingWrapper
+        lang = name.split('-', 1)[1]
+        if processes > 1:
+            return _pool(functools.partial(FreelingWrapper, lang), processes)
+        return LANGUAGES[lang]
+    else:
+        raise ValueError("Unknown analyzer: %r" % name)
+
+
+def _pool(factory, size):
+    from metanl.extprocess import ProcessPool
+    return ProcessPool(factory, size=size)
+
+
+def _batch_function(analyzer, method):
+    """
+    Get a function that applies `method` to a list of texts using the given
+    analyzer, preferring the analyzer's batch version of the method (such as
+    `normalize_list_many`) if it has one.
+    """
+    many = getattr(analyzer, method + '_many', None)
+    if many is not None:
+        return many
+    single = getattr(analyzer, method)
+
+    def apply_to_each(texts, **kwargs):
+        return [single(text, **kwargs) for text in texts]
+    return apply_to_each
+
+
+def _read_lines(source):
+    for line in source:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        yield line.rstrip('\r\n')
+
+
+def normalize_stream(source, analyzer='nltk', method='normalize',
+                     batch_size=1000, **kwargs):
+    """
+    Apply an analyzer's `method` -- such as 'normalize', 'normalize_list', or
+    'tag_and_stem' -- to each line of `source`, and yield the results in
+    order.
+
+    `source` can be a file or any other iterable of lines. Lines are read
+    `batch_size` at a time, and each batch is passed to the analyzer at once.
+    Any other keyword arguments are passed on to the analyzer's method, such
+    as the `pool` of nltk_morphy.tag_and_stem_many().
+    """
+    if isinstance(analyzer, (str, str_func)):
+        analyzer = get_analyzer(analyzer)
+    process_batch = _batch_function(analyzer, method)
+    lines = _read_lines(source)
+    while True:
+        batch = list(itertools.islice(lines, batch_size))
+        if not batch:
+            return
+        for result in process_batch(batch, **kwargs):
+            yield result
+
+
+def format_result(result):
+    """
+    Represent a result as a single line of text. A string is written as
+    itself; anything else, such as a list of words or triples, is written as
+    JSON.
+    """
+    if isinstance(result, str_func):
+        return result
+    return json.dumps(result, ensure_ascii=False)
+
+
+def write_stream(results, outfile):
+    """
+    Write results to an open text file as they're produced, one per line.
+    """
+    for result in results:
+        outfile.write(format_result(result))
+        outfile.write('\n')
+
+
+def normalize_file(infile, outfile, analyzer='nltk', method='normalize',
+                   batch_size=1000, **kwargs):
+    """
+    Read the file named `infile`, and write the results of
+    normalize_stream() on each of its lines to the file named `outfile`.
+    Both files are UTF-8.
+    """
+    with io.open(infile, encoding='utf-8') as input_file:
+        with io.open(outfile, 'w', encoding='utf-8') as output_file:
+            write_stream(
+                normalize_stream(input_file, analyzer, method, batch_size,
+                                 **kwargs),
+                output_file
+            )
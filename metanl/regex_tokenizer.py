@@ -0,0 +1,191 @@
+# coding: utf-8
+from __future__ import unicode_literals
+"""
+A tokenizer for English made of nothing but compiled regular expressions.
+
+It splits text the way `nltk.word_tokenize` does -- Penn Treebank style, with
+"n't" and other clitics split off, double quotes turned into `` and '', and
+punctuation separated -- but it doesn't need to import NLTK or run its Punkt
+sentence splitter, which is much slower. Instead, sentence boundaries are
+found by a few rules that approximate what Punkt decides for ordinary text:
+
+- '?' and '!' always end a sentence.
+- A period after an ordinary word ends a sentence.
+- A period after a known abbreviation or an initial doesn't.
+- A period after a number, or an ellipsis, ends a sentence only if the next
+  word is capitalized.
+
+Punkt learned its decisions from a corpus, so the two can disagree on
+unusual text. Use the 'nltk' engine in metanl.token_utils when exact
+agreement with NLTK matters more than speed.
+"""
+
+import re
+
+# Words that are usually abbreviations when they're followed by a period,
+# written in lowercase without their final period.
+ABBREVIATIONS = set("""
+    a.m adm al apr assn aug ave bldg blvd brig capt cmdr co col conn corp
+    cpl dec dept dist dr e.g esq etc feb fig fla ft gen gov hon hosp i.e inc
+    jan jr jul jun lt ltd maj mar mass messrs mfg mich minn mo mr mrs ms mt
+    no nov oct ok p.m pa pfc ph.d pp prof pvt rep reps rev sen sens sept
+    sgt sr st supt tenn tex u.k u.n u.s u.s.a univ va vol vs wash wis
+""".split())
+
+# Opening quotes and brackets that can come before the start of a sentence,
+# and closing ones that can come after the punctuation at the end of one.
+SENTENCE_OPENERS = '"\'([{«“‘`'
+SENTENCE_CLOSERS = '"\')]}»”’'
+
+WORD_RE = re.compile(r'\S+', re.UNICODE)
+SENTENCE_END_RE = re.compile(
+    r'(\.{2,}|[.?!])[' + re.escape(SENTENCE_CLOSERS) + r']*$', re.UNICODE
+)
+NUMBER_RE = re.compile(r'^[-+]?[\d,]*\.?\d+$', re.UNICODE)
+
+
+def _is_sentence_end(word, end, next_word):
+    """
+    Decide whether a whitespace-separated `word`, which ends with the
+    sentence-ending punctuation `end`, ends a sentence. `next_word` is the
+    word that follows it.
+    """
+    if end in '?!':
+        return True
+    capitalized = next_word.lstrip(SENTENCE_OPENERS)[:1].isupper()
+    if end != '.':
+        # an ellipsis
+        return capitalized
+    base = word[:word.rindex('.')].lstrip(SENTENCE_OPENERS)
+    lowered = base.lower()
+    if lowered in ABBREVIATIONS or lowered.split('-')[-1] in ABBREVIATIONS:
+        return False
+    if len(base) == 1 and base.isalpha():
+        # an initial, as in "J. S. Bach"
+        return False
+    if NUMBER_RE.match(base):
+        return capitalized
+    return True
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, approximating what `nltk.sent_tokenize` does.
+
+    >>> split_sentences('Time is an illusion. Lunchtime, doubly so.')
+    ['Time is an illusion.', 'Lunchtime, doubly so.']
+    >>> split_sentences('Mr. Dent lay in the mud. "Why?" he asked.')
+    ['Mr. Dent lay in the mud.', '"Why?"', 'he asked.']
+    """
+    sentences = []
+    start = 0
+    words = list(WORD_RE.finditer(text))
+    for match, next_match in zip(words, words[1:]):
+        word = match.group()
+        end_match = SENTENCE_END_RE.search(word)
+        if end_match and _is_sentence_end(word, end_match.group(1),
+                                          next_match.group()):
+            sentences.append(text[start:match.end()])
+            start = next_match.start()
+    sentence = text[start:].strip()
+    if sentence:
+        sentences.append(sentence)
+    return sentences
+
+
+# The Penn Treebank rules, as NLTK's word tokenizer applies them to a single
+# sentence. Each list is applied in order. (Where NLTK has consecutive rules
+# that just put spaces around different characters, they're combined here.)
+#
+# To avoid running all of these rules once per sentence, we run them on a
+# whole text at once, with its sentences separated by line breaks. The rules
+# that look for the start or end of a sentence use re.MULTILINE so that they
+# match at those line breaks, and line breaks within a sentence are changed
+# to carriage returns, which the rules treat the same as any other
+# whitespace.
+STARTING_QUOTES = [
+    (re.compile("([«“‘„]|[`]+)", re.U), r" \1 "),
+    (re.compile(r'^"', re.M), r"``"),
+    (re.compile(r"(``)"), r" \1 "),
+    (re.compile(r"([ \(\[{<])(\"|\'{2})"), r"\1 `` "),
+    (re.compile(r"(?i)(?<!\w)(\')(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)", re.U),
+     r"\1 "),
+]
+
+PUNCTUATION = [
+    (re.compile(r'([^\.])(\.)([\]\)}>"\'»”’ ]*)\s*$', re.U | re.M),
+     r"\1 \2 \3 "),
+    (re.compile(r"([:,])([^\d])"), r" \1 \2"),
+    (re.compile(r"([:,])$", re.M), r" \1 "),
+    (re.compile(r"\.{2,}|[;@#$%&‒-―]", re.U), r" \g<0> "),
+    (re.compile(r'([^\.])(\.)([\]\)}>"\']*)\s*$', re.M), r"\1 \2\3 "),
+    (re.compile(r"[?!]"), r" \g<0> "),
+    (re.compile(r"([^'])' "), r"\1 ' "),
+    (re.compile(r"[*\]\[\(\)\{\}\<\>]", re.U), r" \g<0> "),
+    (re.compile(r"--"), r" -- "),
+]
+
+ENDING_QUOTES = [
+    (re.compile("([»”’])", re.U), r" \1 "),
+    (re.compile(r"''|\""), " '' "),
+    (re.compile(r"\s+", re.U), " "),
+    (re.compile(r"([^' ])('[sS]|'[mM]|'[dD]|') "), r"\1 \2 "),
+    (re.compile(r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) "), r"\1 \2 "),
+]
+
+# Words that are split into two tokens, such as "cannot" and "gonna".
+CONTRACTIONS = re.compile(r"""(?i)
+      \b (can) (not) \b
+    | \b (d) ('ye) \b
+    | \b (gim) (me) \b
+    | \b (gon) (na) \b
+    | \b (got) (ta) \b
+    | \b (lem) (me) \b
+    | \b (more) ('n) \b
+    | \b (wan) (na) (?=\s)
+""", re.VERBOSE | re.U)
+TIS_TWAS = re.compile(r"(?i) ('t)(is|was)\b", re.U)
+
+
+def _split_contraction(match):
+    first, second = [group for group in match.groups() if group is not None]
+    return ' %s %s ' % (first, second)
+
+
+def _tokenize_lines(text):
+    """
+    Apply the Treebank rules to text that has one sentence on each line.
+    """
+    for regex, replacement in STARTING_QUOTES:
+        text = regex.sub(replacement, text)
+    for regex, replacement in PUNCTUATION:
+        text = regex.sub(replacement, text)
+    text = ' ' + text + ' '
+    for regex, replacement in ENDING_QUOTES:
+        text = regex.sub(replacement, text)
+    text = CONTRACTIONS.sub(_split_contraction, text)
+    text = TIS_TWAS.sub(r" \1 \2 ", text)
+    return text.split()
+
+
+def tokenize_sentence(sentence):
+    """
+    Split a single sentence into Penn Treebank tokens, the way
+    `nltk.word_tokenize` would.
+
+    >>> tokenize_sentence("They've got a page for people like you.")
+    ['They', "'ve", 'got', 'a', 'page', 'for', 'people', 'like', 'you', '.']
+    """
+    return _tokenize_lines(sentence.replace('\n', '\r'))
+
+
+def tokenize(text):
+    """
+    Split text into sentences and then into Penn Treebank tokens.
+
+    >>> tokenize("I can't. Avoid fragments.")
+    ['I', 'ca', "n't", '.', 'Avoid', 'fragments', '.']
+    """
+    return _tokenize_lines('\n'.join(
+        sentence.replace('\n', '\r') for sentence in split_sentences(text)
+    ))
@@ -0,0 +1,157 @@
+from __future__ import unicode_literals
+"""
+Instrumentation for finding out where the time goes when normalizing text:
+how long is spent waiting on external processes, parsing their output,
+tagging, and stemming, and how often caches save us the trouble.
+
+Instrumentation is off unless you ask for it. To turn it on, give a Stats
+object to a ProcessWrapper (its `stats` argument or attribute), or to
+metanl.nltk_morphy.set_stats(). When a Stats object isn't in use, the
+instrumented code only checks whether it's None.
+
+    >>> stats = Stats()
+    >>> stats.count('lookups')
+    >>> stats.count('lookups', 2)
+    >>> stats.record_time('lookup', 0.003)
+    >>> snapshot = stats.snapshot()
+    >>> snapshot['counts']
+    {'lookups': 3}
+    >>> snapshot['timings']['lookup']['count']
+    1
+"""
+
+import threading
+import time
+import sys
+if sys.version_info.major == 2:
+    clock = time.time
+else:
+    clock = time.perf_counter
+
+# Latencies are counted in buckets whose upper bounds are powers of 2
+# microseconds, from 1 microsecond up to about 37 hours.
+NUM_BUCKETS = 38
+
+
+def _bucket(seconds):
+    """
+    Get the index of the histogram bucket for a latency in seconds. Bucket
+    `i` holds latencies of up to 2 ** i microseconds.
+    """
+    micros = int(seconds * 1e6)
+    if micros <= 1:
+        return 0
+    return min((micros - 1).bit_length(), NUM_BUCKETS - 1)
+
+
+class Stats(object):
+    """
+    A collection of counters and latency histograms, identified by name.
+
+    Names are dotted strings, usually starting with the thing being measured,
+    such as 'FreelingWrapper:en.bytes_in' or 'nltk_morphy.tag'. Counters are
+    added to with :meth:`count`, and latencies in seconds are recorded with
+    :meth:`record_time`.
+
+    If `callback` is given, it's called as `callback(kind, name, value)` for
+    every measurement as it happens, where `kind` is 'count' or 'time', so
+    measurements can be passed on to another monitoring system.
+
+    A Stats object can be shared between threads.
+    """
+    clock = staticmethod(clock)
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._counts = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, amount=1):
+        """
+        Add `amount` to the counter called `name`.
+        """
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+        if self.callback is not None:
+            self.callback('count', name, amount)
+
+    def record_time(self, name, seconds):
+        """
+        Record that something called `name` took `seconds` seconds.
+        """
+        bucket = _bucket(seconds)
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                # count, total seconds, max seconds, histogram
+                timing = self._timings[name] = [0, 0., 0., [0] * NUM_BUCKETS]
+            timing[0] += 1
+            timing[1] += seconds
+            if seconds > timing[2]:
+                timing[2] = seconds
+            timing[3][bucket] += 1
+        if self.callback is not None:
+            self.callback('time', name, seconds)
+
+    def reset(self):
+        """
+        Set all counters and histograms back to empty.
+        """
+        with self._lock:
+            self._counts.clear()
+            self._timings.clear()
+
+    def snapshot(self):
+        """
+        Get the current measurements as a dictionary of plain values, which
+        can be saved as JSON. It has two keys:
+
+        - 'counts', mapping each counter name to its value
+        - 'timings', mapping each latency name to a dictionary of its 'count',
+          'total', 'mean', and 'max' in seconds, estimates of its median and
+          99th percentile ('p50' and 'p99'), and its 'histogram': a list of
+          [upper bound in microseconds, count] pairs for the non-empty
+          buckets.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            timings = dict(
+                (name, (count, total, maximum, list(histogram)))
+                for name, (count, total, maximum, histogram)
+                in self._timings.items()
+            )
+        return {
+            'counts': counts,
+            'timings': dict(
+                (name, _summarize(*timing))
+                for name, timing in timings.items()
+            ),
+        }
+
+
+def _summarize(count, total, maximum, histogram):
+    return {
+        'count': count,
+        'total': total,
+        'mean': total / count,
+        'max': maximum,
+        'p50': _percentile(histogram, count, 0.5, maximum),
+        'p99': _percentile(histogram, count, 0.99, maximum),
+        'histogram': [[2 ** bucket, n] for bucket, n in enumerate(histogram)
+                      if n],
+    }
+
+
+def _percentile(histogram, count, fraction, maximum):
+    """
+    Estimate a percentile of the latencies in a histogram, as the upper
+    bound of the bucket it falls in (but no more than the maximum latency).
+    """
+    needed = count * fraction
+    seen = 0
+    for bucket, n in enumerate(histogram):
+        seen += n
+        if seen >= needed:
+            return min(2 ** bucket / 1e6, maximum)
+    return maximum
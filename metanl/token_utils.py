@@ -8,14 +8,47 @@ be able to do their job in any Western language that uses spaces.
 
 import re
 import unicodedata
+from metanl import regex_tokenizer
+import sys
+if sys.version_info.major == 2:
+    range = xrange
+    chr = unichr
 
+# The tokenizer that tokenize() uses when it isn't asked for a particular one.
+# 'nltk' runs NLTK's Punkt sentence splitter and its word tokenizer; 'regex'
+# uses metanl.regex_tokenizer, which gives the same tokens for ordinary text
+# and is several times faster.
+TOKENIZER_ENGINES = ('nltk', 'regex')
+DEFAULT_TOKENIZER_ENGINE = 'nltk'
 
-def tokenize(text):
+
+def set_tokenizer_engine(engine):
+    """
+    Choose the tokenizer that tokenize() uses by default, which also affects
+    the modules that use it, such as metanl.nltk_morphy.
+    """
+    global DEFAULT_TOKENIZER_ENGINE
+    if engine not in TOKENIZER_ENGINES:
+        raise ValueError("Unknown tokenizer engine: %r" % engine)
+    DEFAULT_TOKENIZER_ENGINE = engine
+
+
+def tokenize(text, engine=None):
     """
     Split a text into tokens (words, morphemes we can separate such as
     "n't", and punctuation).
+
+    `engine` can be 'nltk' or 'regex', as described at
+    DEFAULT_TOKENIZER_ENGINE. If it's None, the default engine is used.
     """
-    return list(_tokenize_gen(text))
+    if engine is None:
+        engine = DEFAULT_TOKENIZER_ENGINE
+    if engine == 'regex':
+        return regex_tokenizer.tokenize(text)
+    elif engine == 'nltk':
+        return list(_tokenize_gen(text))
+    else:
+        raise ValueError("Unknown tokenizer engine: %r" % engine)
 
 
 def _tokenize_gen(text):
@@ -33,11 +66,106 @@ def untokenize(words):
     Ideally, `untokenize(tokenize(text))` should be identical to `text`,
     except for line breaks.
     """
-    text = ' '.join(words)
+    return _untokenize_text(' '.join(words))
+
+
+def untokenize_iter(words, buffer_size=1000):
+    """
+    Untokenize a sequence of words that may be too long to join into one
+    string, such as the tokens of a whole file, yielding pieces of the result
+    as it goes. Joining the pieces gives the same text as :func:`untokenize`.
+
+    Words are buffered until there are at least `buffer_size` of them and
+    there's a space between two of them that untokenizing wouldn't change.
+    """
+    buffered = []
+    first = True
+    previous = None
+    for word in words:
+        if len(buffered) >= buffer_size and _is_word_break(previous, word):
+            text = _untokenize_text(' '.join(buffered))
+            yield text if first else ' ' + text
+            first = False
+            buffered = []
+        buffered.append(word)
+        previous = word
+    if buffered:
+        text = _untokenize_text(' '.join(buffered))
+        yield text if first else ' ' + text
+
+
+def _is_word_break(left, right):
+    """
+    Determine whether the space between two words is one that untokenizing
+    leaves alone, and no rule of untokenizing can see past.
+
+    That's true when letters or digits are on both sides of it, except when
+    the right word starts with 'n', which could be the start of "n't" or of
+    the "not" in "can not".
+    """
+    return (left and right and left[-1].isalnum() and right[0].isalnum() and
+            right[0] != 'n')
+
+
+# Untokenizing ordinary text is a matter of removing some of the spaces that
+# come before punctuation. This expression finds the ones that might be
+# removed: spaces before a run of punctuation that ends the text or is
+# followed by a space or quotation mark, and spaces before an apostrophe or
+# "n't".
+UNTOKENIZE_SPACE_RE = re.compile(r"""
+    \x20(?=[.,:;?!%'n])
+    (?: ([.,:;?!%]+)(?=[\x20'"]|\Z)
+      | (?='|n\x20't|n't)
+    )
+""", re.VERBOSE)
+
+# Other rules apply when the text contains one of these, or ends with a line
+# break, and then the rules are applied one at a time.
+UNTOKENIZE_SPECIAL = ('`', " ''", '. . .', ' ( ', ' ) ', 'can not', '  ')
+UNTOKENIZE_PUNCT_RE = re.compile(r' ([.,:;?!%]+)([ \'"`])')
+UNTOKENIZE_FINAL_PUNCT_RE = re.compile(r' ([.,:;?!%]+)$')
+
+
+def _untokenize_text(text):
+    """
+    Untokenize a string of words joined by spaces.
+
+    This gives the same result as applying each of the rules in
+    _untokenize_steps() in turn, but ordinary text only needs one pass
+    through UNTOKENIZE_SPACE_RE.
+    """
+    if text.endswith('\n'):
+        return _untokenize_steps(text)
+    for special in UNTOKENIZE_SPECIAL:
+        if special in text:
+            return _untokenize_steps(text)
+    pieces = []
+    start = 0
+    # When a space is removed before punctuation, the space after the
+    # punctuation (if there is one) can't also be removed that way.
+    kept = -1
+    end = len(text)
+    for match in UNTOKENIZE_SPACE_RE.finditer(text):
+        space = match.start()
+        if match.group(1) is not None and match.end() < end:
+            if space == kept:
+                continue
+            if text[match.end()] == ' ':
+                kept = match.end()
+        pieces.append(text[start:space])
+        start = space + 1
+    pieces.append(text[start:])
+    return ''.join(pieces).strip()
+
+
+def _untokenize_steps(text):
+    """
+    Untokenize a string of words joined by spaces, one rule at a time.
+    """
     step1 = text.replace("`` ", '"').replace(" ''", '"').replace('. . .', '...')
     step2 = step1.replace(" ( ", " (").replace(" ) ", ") ")
-    step3 = re.sub(r' ([.,:;?!%]+)([ \'"`])', r"\1\2", step2)
-    step4 = re.sub(r' ([.,:;?!%]+)$', r"\1", step3)
+    step3 = UNTOKENIZE_PUNCT_RE.sub(r"\1\2", step2)
+    step4 = UNTOKENIZE_FINAL_PUNCT_RE.sub(r"\1", step3)
     step5 = step4.replace(" '", "'").replace(" n't", "n't").replace(
         "can not", "cannot")
     step6 = step5.replace(" ` ", " '")
@@ -45,10 +173,10 @@ def untokenize(words):
 
 
 # This expression scans through a reversed string to find segments of
-# camel-cased text. Comments show what these mean, forwards, in preference
-# order:
+# camel-cased text, each starting where the last one ended. Comments show what
+# these mean, forwards, in preference order:
 CAMEL_RE = re.compile(r"""
-    ^( [A-Z]+                 # A string of all caps, such as an acronym
+     ( [A-Z]+                 # A string of all caps, such as an acronym
      | [^A-Z0-9 _]+[A-Z _]    # A single capital letter followed by lowercase
                               #   letters, or lowercase letters on their own
                               #   after a word break
@@ -96,20 +224,31 @@ def un_camel_case(text):
     'Hindi-Urdu'
     """
     revtext = text[::-1]
+    match_at = CAMEL_RE.match
     pieces = []
-    while revtext:
-        match = CAMEL_RE.match(revtext)
+    pos = 0
+    end = len(revtext)
+    while pos < end:
+        match = match_at(revtext, pos)
         if match:
-            pieces.append(match.group(1))
-            revtext = revtext[match.end():]
+            piece = match.group(1).strip(' _')
+            pos = match.end()
         else:
-            pieces.append(revtext)
-            revtext = ''
-    revstr = ' '.join(piece.strip(' _') for piece in pieces
-                      if piece.strip(' _'))
+            piece = revtext[pos:].strip(' _')
+            pos = end
+        if piece:
+            pieces.append(piece)
+    revstr = ' '.join(pieces)
     return revstr[::-1].replace('- ', '-')
 
 
+def un_camel_case_many(texts):
+    """
+    Apply :func:`un_camel_case` to each of a list of texts.
+    """
+    return [un_camel_case(text) for text in texts]
+
+
 # see http://www.fileformat.info/info/unicode/category/index.htm
 BOUNDARY_CATEGORIES = {'Cc',  # control characters
                        'Cf',  # format characters
@@ -125,27 +264,80 @@ BOUNDARY_CATEGORIES = {'Cc',  # control characters
                        'Zs',  # space separator
                        }
 
-def string_pieces(s, maxlen=1024):
+# A regular expression that matches as much text as possible that ends with a
+# possible boundary, built the first time it's needed by _boundary_re().
+_BOUNDARY_RE = None
+
+
+def _class_char(char):
+    if char in '\\]^-[':
+        return '\\' + char
+    return char
+
+
+def _boundary_re():
+    """
+    Get a regular expression that matches as much text as possible that ends
+    with a character that might be in one of the BOUNDARY_CATEGORIES.
+
+    The expression includes every character in the Basic Multilingual Plane
+    whose category is one of those, and every character outside of it,
+    whose category has to be checked separately. (A character class that
+    lists the many ranges of unassigned characters outside the BMP would be
+    much slower to search.)
+    """
+    global _BOUNDARY_RE
+    if _BOUNDARY_RE is None:
+        ranges = []
+        for codepoint in range(0x10000):
+            if unicodedata.category(chr(codepoint)) in BOUNDARY_CATEGORIES:
+                if ranges and ranges[-1][1] == codepoint - 1:
+                    ranges[-1][1] = codepoint
+                else:
+                    ranges.append([codepoint, codepoint])
+        if sys.maxunicode > 0xffff:
+            ranges.append([0x10000, sys.maxunicode])
+        char_class = ''.join(
+            _class_char(chr(start)) if start == end else
+            '%s-%s' % (_class_char(chr(start)), _class_char(chr(end)))
+            for start, end in ranges
+        )
+        _BOUNDARY_RE = re.compile('.*[%s]' % char_class, re.DOTALL)
+    return _BOUNDARY_RE
+
+
+def string_pieces(s, maxlen=1024, offsets=False):
     """
     Takes a (unicode) string and yields pieces of it that are at most `maxlen`
     characters, trying to break it at punctuation/whitespace. This is an
     important step before using a tokenizer with a maximum buffer size.
+
+    If `offsets` is True, it yields the (start, end) positions of the pieces
+    instead of the pieces themselves.
     """
     if not s:
         return
+    category = unicodedata.category
+    length = len(s)
     i = 0
     while True:
         j = i + maxlen
-        if j >= len(s):
-            yield s[i:]
+        if j >= length:
+            yield (i, length) if offsets else s[i:]
             return
-        # Using "j - 1" keeps boundary characters with the left chunk
-        while unicodedata.category(s[j - 1]) not in BOUNDARY_CATEGORIES:
-            j -= 1
-            if j == i:
-                # No boundary available; oh well.
-                j = i + maxlen
-                break
-        yield s[i:j]
+        # Break after the last boundary character in range, which keeps
+        # boundary characters with the left chunk.
+        match = _boundary_re().match(s, i, j)
+        if match:
+            k = match.end()
+            # If that was a character outside the BMP that isn't a boundary,
+            # keep looking before it, one character at a time.
+            while category(s[k - 1]) not in BOUNDARY_CATEGORIES:
+                k -= 1
+                if k == i:
+                    break
+            if k > i:
+                j = k
+        # Otherwise, there's no boundary available; oh well.
+        yield (i, j) if offsets else s[i:j]
         i = j
-
@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+"""
+Word frequencies, from the Leeds Internet Corpus lists in
+metanl/data/source-data, compiled into a compact binary format.
+
+Loading a frequency list as a dictionary of Python strings takes much more
+memory than the list itself, and every process that loads it pays that
+cost again. A compiled wordlist is used directly from a memory-mapped file
+instead: it takes a few bytes per word besides the words themselves, and
+processes that use the same wordlist, such as forked workers, share its
+pages.
+
+    >>> get_frequency('de', 'es')
+    54128.31
+    >>> list(get_wordlist('internet-es').top(2))
+    [('de', 54128.31), ('la', 31725.44)]
+
+Wordlists are compiled the first time they're used, or all at once by
+running `python -m metanl.wordlist`. They're kept in WORDLIST_DIR, which is
+$METANL_WORDLIST_DIR if that's set, or else a directory in the user's cache
+directory, because the installed package may not be writable.
+
+merge_lists() combines several wordlists into one, with a weight for each.
+It needs NumPy.
+
+The format of a compiled wordlist is, in little-endian byte order:
+
+- a header: the magic string b'MNLWORDS', a 32-bit version number, a 32-bit
+  count of words, and the 64-bit size of the corpus in tokens (0 if it's
+  unknown)
+- the frequency of each word, as 64-bit floats, most frequent first
+- where each word starts in the string table, as 32-bit offsets, plus one
+  more offset for the end of the table
+- the word numbers in order of their UTF-8 bytes, as 32-bit integers, for
+  looking up words by binary search
+- the string table: all the words in UTF-8, one after another
+"""
+
+import argparse
+import codecs
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+import sys
+if sys.version_info.major == 2:
+    range = xrange
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from metanl.leeds_corpus_reader import (FrequencyList, SOURCE_DATA_DIR,
+                                        source_data_path, replace_file,
+                                        _format_frequency)
+
+
+def _default_wordlist_dir():
+    """
+    Get the directory that wordlists are compiled into, unless it's set
+    otherwise: $METANL_WORDLIST_DIR, or 'metanl/wordlists' in the user's
+    cache directory.
+    """
+    if os.environ.get('METANL_WORDLIST_DIR'):
+        return os.environ['METANL_WORDLIST_DIR']
+    cache_dir = (os.environ.get('XDG_CACHE_HOME') or
+                 os.environ.get('LOCALAPPDATA') or
+                 os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'metanl', 'wordlists')
+
+# Assign to this to compile and look for wordlists somewhere else.
+WORDLIST_DIR = _default_wordlist_dir()
+MAGIC = b'MNLWORDS'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ')
+
+
+def _little_endian(arr):
+    """
+    Get the bytes of an array in little-endian order.
+    """
+    if sys.byteorder != 'little':
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tostring() if sys.version_info.major == 2 else arr.tobytes()
+
+
+def compile_wordlist(entries, filename, corpus_size=None):
+    """
+    Write a compiled wordlist to `filename`, given its entries as (word,
+    frequency) pairs, most frequent first.
+    """
+    encoded = []
+    freqs = array('d')
+    for word, freq in entries:
+        encoded.append(word.encode('utf-8'))
+        freqs.append(freq)
+
+    offsets = array('I', [0])
+    position = 0
+    for word_bytes in encoded:
+        position += len(word_bytes)
+        offsets.append(position)
+    # Sort by word, then by rank, so that a lookup finds the most frequent
+    # of any duplicate words first.
+    order = array('I', sorted(range(len(encoded)),
+                              key=lambda index: encoded[index]))
+
+    # Write to a temporary file of our own, so that processes compiling the
+    # same wordlist at once don't write over each other, and then replace
+    # any existing file all at once, in case another process is using it.
+    out = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(filename)),
+        prefix=os.path.basename(filename) + '.', suffix='.tmp', delete=False
+    )
+    try:
+        with out:
+            out.write(HEADER.pack(MAGIC, VERSION, len(encoded),
+                                  corpus_size or 0))
+            out.write(_little_endian(freqs))
+            out.write(_little_endian(offsets))
+            out.write(_little_endian(order))
+            out.write(b''.join(encoded))
+        replace_file(out.name, filename)
+    except BaseException:
+        os.remove(out.name)
+        raise
+
+
+def compile_source(name, directory=None):
+    """
+    Compile the frequency list in metanl/data/source-data called `name`,
+    such as 'internet-es', into `directory` (by default, WORDLIST_DIR), and
+    return the compiled file's path.
+    """
+    if directory is None:
+        directory = WORDLIST_DIR
+    try:
+        os.makedirs(directory)
+    except OSError:
+        # Another process may have just made it
+        if not os.path.isdir(directory):
+            raise
+    filename = os.path.join(directory, name + '.wl')
+    with FrequencyList(source_data_path(name)) as freqs:
+        compile_wordlist(((word, freq) for rank, freq, word in freqs),
+                         filename, freqs.corpus_size)
+    return filename
+
+
+def _read_array(data, typecode, start, count):
+    """
+    Get `count` items of an array from the bytes of a compiled wordlist,
+    starting at byte `start`, without copying them if possible.
+    """
+    end = start + count * array(typecode).itemsize
+    if sys.version_info.major == 2 or sys.byteorder != 'little':
+        arr = array(typecode)
+        arr.fromstring(bytes(data[start:end]))
+        if sys.byteorder != 'little':
+            arr.byteswap()
+        return arr
+    return memoryview(data)[start:end].cast(typecode)
+
+
+class Wordlist(object):
+    """
+    A list of words and their frequencies, read from a compiled wordlist
+    file. Words are in order of frequency, and they're numbered by rank,
+    starting from 1.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as infile:
+            self._data = mmap.mmap(infile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        magic, version, count, corpus_size = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("%r isn't a compiled wordlist." % filename)
+        self.corpus_size = corpus_size or None
+        self._count = count
+
+        start = HEADER.size
+        self._freqs = _read_array(self._data, 'd', start, count)
+        start += count * 8
+        self._offsets = _read_array(self._data, 'I', start, count + 1)
+        start += (count + 1) * 4
+        self._order = _read_array(self._data, 'I', start, count)
+        self._strings = start + count * 4
+
+    def _word_bytes(self, index):
+        start = self._strings + self._offsets[index]
+        end = self._strings + self._offsets[index + 1]
+        return self._data[start:end]
+
+    def _find(self, word):
+        """
+        Get the index of a word, or -1 if it isn't in the list.
+        """
+        key = word.encode('utf-8')
+        order = self._order
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word_bytes(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._word_bytes(order[lo]) == key:
+            return order[lo]
+        return -1
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        return self._find(word) >= 0
+
+    def frequency(self, word, default=0):
+        """
+        Get the frequency of a word, or `default` if it isn't in the list.
+        """
+        index = self._find(word)
+        if index < 0:
+            return default
+        return self._freqs[index]
+
+    def rank(self, word):
+        """
+        Get the rank of a word, or None if it isn't in the list.
+        """
+        index = self._find(word)
+        if index < 0:
+            return None
+        return index + 1
+
+    def word(self, rank):
+        """
+        Get the word at a given rank.
+        """
+        if not 1 <= rank <= self._count:
+            raise IndexError("rank out of range: %r" % rank)
+        return self._word_bytes(rank - 1).decode('utf-8')
+
+    def top(self, n=None):
+        """
+        Iterate over the `n` most frequent (word, frequency) pairs, or all
+        of them if `n` is None.
+        """
+        if n is None or n > self._count:
+            n = self._count
+        for index in range(n):
+            yield self._word_bytes(index).decode('utf-8'), self._freqs[index]
+
+    def __iter__(self):
+        return self.top()
+
+    def words(self):
+        """
+        Iterate over the words, most frequent first.
+        """
+        strings = self._data[self._strings:]
+        offsets = self._offsets
+        for index in range(self._count):
+            yield strings[offsets[index]:offsets[index + 1]].decode('utf-8')
+
+
+class MergedWordlist(object):
+    """
+    The result of merge_lists(): a list of words, with their combined
+    frequencies and the logarithms of those frequencies, most frequent
+    first.
+
+    `words` is a list of the words, and `freqs` and `log_freqs` are NumPy
+    arrays of their frequencies and logarithmic frequencies.
+    """
+    def __init__(self, words, freqs, log_freqs):
+        self.words = words
+        self.freqs = freqs
+        self.log_freqs = log_freqs
+        self._worddict = None
+
+    @property
+    def worddict(self):
+        """
+        A dictionary from each word to its frequency.
+        """
+        if self._worddict is None:
+            self._worddict = dict(zip(self.words, self.freqs.tolist()))
+        return self._worddict
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.worddict
+
+    def frequency(self, word, default=0):
+        """
+        Get the frequency of a word, or `default` if it isn't in the list.
+        """
+        return self.worddict.get(word, default)
+
+    def __iter__(self):
+        return iter(zip(self.words, self.freqs.tolist()))
+
+    def _save(self, filename, values):
+        with codecs.open(filename, 'w', encoding='utf-8') as out:
+            for word, value in zip(self.words, values):
+                out.write('%s,%s\n' % (word, value))
+
+    def save(self, filename):
+        """
+        Write the words and their frequencies to a file, as 'word,frequency'
+        lines.
+        """
+        self._save(filename, [_format_frequency(freq)
+                              for freq in self.freqs.tolist()])
+
+    def save_logarithmic(self, filename):
+        """
+        Write the words and their logarithmic frequencies to a file, as
+        'word,frequency' lines.
+        """
+        self._save(filename, self.log_freqs.tolist())
+
+
+def _source_arrays(source, prefix):
+    """
+    Get the words of a list to merge, with `prefix` in front of them, and
+    their frequencies as proportions of the corpus they came from.
+
+    A list with a known corpus size, like the ones compiled from the Leeds
+    lists, gives either frequencies per million tokens of that corpus (as
+    the 'internet-*' lists do) or raw counts (as 'rnc-modern' does). Either
+    way, its frequencies add up to somewhat less than what they're out of: a
+    million, or the corpus size. So they're divided by whichever of the two
+    is closer to their total. A list without a corpus size has its
+    frequencies divided by their total.
+    """
+    if isinstance(source, Wordlist):
+        words = list(source.words())
+        freqs = np.frombuffer(source._freqs, dtype=np.float64)
+    else:
+        if isinstance(source, MergedWordlist):
+            pairs = list(source)
+        elif hasattr(source, 'items'):
+            pairs = list(source.items())
+        else:
+            pairs = list(source)
+        words = [word for word, freq in pairs]
+        freqs = np.array([freq for word, freq in pairs], dtype=np.float64)
+    if prefix:
+        words = [prefix + word for word in words]
+    corpus_size = getattr(source, 'corpus_size', None)
+    total = freqs.sum()
+    if not corpus_size:
+        divisor = total or 1.
+    elif total > 0 and (abs(np.log(total / corpus_size)) <
+                        abs(np.log(total / 1e6))):
+        divisor = corpus_size
+    else:
+        divisor = 1e6
+    return words, freqs / divisor
+
+
+def merge_lists(weighted_lists, base=2):
+    """
+    Combine several lists of word frequencies into one.
+
+    `weighted_lists` is a list of (wordlist, prefix, weight) triples. Each
+    wordlist can be a Wordlist, a MergedWordlist, a dictionary from words to
+    frequencies, or a list of (word, frequency) pairs. Its words get
+    `prefix` put in front of them, and its frequencies are made into
+    proportions of its corpus (see _source_arrays) and multiplied by
+    `weight`. A word's combined frequency is the sum of these over all the
+    lists it appears in.
+
+    Its logarithmic frequency is `floor(log(frequency + 1))` in the given
+    `base`, the kind of small integer that's convenient for ranking words.
+
+    Returns a MergedWordlist, in order of frequency and then of the words.
+    """
+    if np is None:
+        raise ImportError("merge_lists() requires NumPy.")
+    # Align the vocabularies, by giving each different word a number the
+    # first time it appears. Then the frequencies of each word from all the
+    # lists can be added up in one step.
+    numbers = {}
+    indices = []
+    values = []
+    for wordlist, prefix, weight in weighted_lists:
+        words, proportions = _source_arrays(wordlist, prefix)
+        indices.append(np.array([numbers.setdefault(word, len(numbers))
+                                 for word in words], dtype=np.intp))
+        values.append(proportions * weight)
+    vocab = list(numbers)
+    if not vocab:
+        return MergedWordlist([], np.zeros(0), np.zeros(0, dtype=np.int64))
+    freqs = np.bincount(np.concatenate(indices),
+                        weights=np.concatenate(values), minlength=len(vocab))
+
+    # Sort by descending frequency, and then alphabetically.
+    alphabetical = np.empty(len(vocab), dtype=np.intp)
+    alphabetical[sorted(range(len(vocab)), key=vocab.__getitem__)] = (
+        np.arange(len(vocab))
+    )
+    order = np.lexsort((alphabetical, -freqs))
+    freqs = freqs[order]
+    log_freqs = np.floor(np.log1p(freqs) / np.log(base)).astype(np.int64)
+    return MergedWordlist([vocab[index] for index in order.tolist()], freqs,
+                          log_freqs)
+
+
+# Wordlists that have been loaded, by name
+_WORDLISTS = {}
+
+
+def get_wordlist(name):
+    """
+    Get a Wordlist by name, such as 'internet-es'. Wordlists that come from
+    metanl/data/source-data are compiled the first time they're needed, and
+    recompiled if their source changes.
+    """
+    if name not in _WORDLISTS:
+        filename = os.path.join(WORDLIST_DIR, name + '.wl')
+        try:
+            source = source_data_path(name)
+        except KeyError:
+            source = None
+        if source is not None and (
+            not os.path.exists(filename) or
+            os.path.getmtime(filename) < os.path.getmtime(source)
+        ):
+            compile_source(name)
+        elif source is None and not os.path.exists(filename):
+            raise KeyError("There's no wordlist named %r." % name)
+        _WORDLISTS[name] = Wordlist(filename)
+    return _WORDLISTS[name]
+
+
+def get_frequency(word, lang, default=0):
+    """
+    Get the frequency of a word, in occurrences per million words, in the
+    Leeds Internet Corpus for the language `lang`. Words are looked up
+    exactly as given, so capitalization matters.
+    """
+    return get_wordlist('internet-' + lang).frequency(word, default)
+
+
+def source_names():
+    """
+    Get the names of the frequency lists in metanl/data/source-data.
+    """
+    names = []
+    for filename in sorted(os.listdir(SOURCE_DATA_DIR)):
+        if filename.endswith('-forms.num'):
+            names.append(filename[:-len('-forms.num')])
+        elif filename.endswith('.num.html'):
+            names.append(filename[:-len('.num.html')])
+    return names
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compile frequency lists into wordlists."
+    )
+    parser.add_argument('names', nargs='*',
+                        help='the lists to compile (default: all of them)')
+    parser.add_argument('--output-dir',
+                        help='where to put them (default: %s)' % WORDLIST_DIR)
+    args = parser.parse_args(argv)
+    for name in args.names or source_names():
+        print(compile_source(name, args.output_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+from __future__ import print_function
 from metanl.wordlist import get_wordlist, merge_lists
 
 def merge_english():
@@ -7,7 +8,7 @@ def merge_english():
     combined.save('multi-en.txt')
     combined.save_logarithmic('multi-en-logarithmic.txt')
     total = sum(combined.worddict.values())
-    print "Average frequency:", total / len(combined.worddict)
+    print("Average frequency:", total / len(combined.worddict))
 
 if __name__ == '__main__':
     merge_english()
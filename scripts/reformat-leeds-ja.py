@@ -1,5 +1,4 @@
-from metanl import japanese
 from metanl.leeds_corpus_reader import translate_leeds_corpus
 
 translate_leeds_corpus('../metanl/data/source-data/internet-ja-forms.num',
-    '../metanl/data/leeds-internet-ja.txt', japanese.normalize)
+    '../metanl/data/leeds-internet-ja.txt', 'mecab')
@@ -56,6 +56,14 @@ setup(
     classifiers = classifiers,
     long_description = "\n".join(doclines[2:]),
     packages=['metanl'],
-    package_data = {'metanl': ['data/freeling/*.cfg', 'data/freeling/*.dat']},
+    package_data = {'metanl': ['data/freeling/*.cfg', 'data/freeling/*.dat',
+                               'data/source-data/*.num',
+                               'data/source-data/*.num.html']},
     install_requires=[nltk_version, 'ftfy >= 3'],
+    extras_require={'merge': ['numpy']},
+    entry_points={
+        'console_scripts': [
+            'metanl-translate-leeds = metanl.leeds_corpus_reader:main',
+        ],
+    },
 )
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import asyncio
+
+from metanl.aioprocess import AsyncProcessWrapper
+from metanl.extprocess import ProcessError, ProcessTimeout, RestartPolicy
+from metanl.fakes import FakeFreelingWrapper, FakeMeCabWrapper
+from metanl.freeling import english, FreelingWrapper
+from metanl.mecab import MeCabWrapper, tag_and_stem
+from nose.tools import eq_
+
+
+def test_async_matches_sync():
+    texts = ["This is a test.\n\nIt has two paragraphs, and that's okay.",
+             "this has\ntwo lines", "", "Dogs and cats"] * 5
+
+    async def run_all():
+        wrapper = AsyncProcessWrapper(FreelingWrapper('en'))
+        # run the requests concurrently, so they have to share the pipe
+        results = await asyncio.gather(
+            *[wrapper.tag_and_stem(text) for text in texts]
+        )
+        await wrapper.close()
+        return results
+
+    eq_(asyncio.run(run_all()),
+        [english.tag_and_stem(text) for text in texts])
+
+
+def test_async_japanese():
+    async def run_all():
+        wrapper = AsyncProcessWrapper(MeCabWrapper())
+        results = (await wrapper.normalize('これはテストです'),
+                   await wrapper.tag_and_stem('これはテストです。'))
+        await wrapper.close()
+        return results
+
+    eq_(asyncio.run(run_all()),
+        ('テスト', tag_and_stem('これはテストです。')))
+
+
+def test_fake_concurrent():
+    texts = ['text number %d' % i for i in range(20)] + ['', 'The Dogs']
+    fake = FakeFreelingWrapper('en')
+
+    async def run_all():
+        wrapper = AsyncProcessWrapper(fake)
+        results = await asyncio.gather(
+            *[wrapper.tag_and_stem(text) for text in texts]
+        )
+        await wrapper.close()
+        return results
+
+    eq_(asyncio.run(run_all()), [fake.tag_and_stem(text) for text in texts])
+
+
+def test_fake_long_line():
+    # Longer than the default limit of an asyncio stream's readline()
+    word = 'a' * 70000
+
+    async def run_all():
+        wrapper = AsyncProcessWrapper(FakeFreelingWrapper('en'))
+        result = await wrapper.normalize(word + ' dogs')
+        await wrapper.close()
+        return result
+
+    eq_(asyncio.run(run_all()), word + ' dogs')
+
+
+def test_fake_timeout():
+    async def run_all():
+        wrapper = AsyncProcessWrapper(FakeMeCabWrapper(hang_on='hang',
+                                                       timeout=0.5))
+        first = await wrapper.normalize('テスト')
+        try:
+            await wrapper.normalize('hang')
+            assert False, "normalize should have timed out"
+        except ProcessTimeout:
+            pass
+        # A new process is started for the next request
+        results = await asyncio.gather(wrapper.normalize('ok'),
+                                       wrapper.normalize('テスト'))
+        await wrapper.close()
+        return [first] + results
+
+    eq_(asyncio.run(run_all()), ['テスト', 'ok', 'テスト'])
+
+
+def test_fake_restarts():
+    crashing = FakeFreelingWrapper('en', crash_after=2,
+                                   restart_policy=RestartPolicy(backoff=0))
+    failing = FakeFreelingWrapper('en', crash_on='boom',
+                                  restart_policy=RestartPolicy(backoff=0))
+    texts = ['text number %d' % i for i in range(6)]
+
+    async def run_all():
+        wrapper = AsyncProcessWrapper(crashing)
+        results = [await wrapper.normalize(text) for text in texts]
+        await wrapper.close()
+
+        wrapper = AsyncProcessWrapper(failing)
+        try:
+            await wrapper.normalize('boom')
+            assert False, "normalize should have given up"
+        except ProcessError:
+            pass
+        results.append(await wrapper.normalize('ok'))
+        await wrapper.close()
+        return results
+
+    eq_(asyncio.run(run_all()), texts + ['ok'])
+    eq_(crashing.restart_policy.restarts, 2)
+    eq_(failing.restart_policy.stats()['failures'], 4)
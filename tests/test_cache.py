@@ -0,0 +1,22 @@
+from __future__ import unicode_literals
+
+from metanl.cache import LRUCache
+from nose.tools import eq_
+
+
+def test_lru_cache():
+    cache = LRUCache(3)
+    for letter in 'abc':
+        cache[letter] = letter.upper()
+    eq_(cache.get('a'), 'A')
+    cache['d'] = 'D'
+
+    # 'b' was the least recently used, so it's gone
+    assert 'b' not in cache
+    eq_(cache.get('b'), None)
+    eq_(cache['a'], 'A')
+    eq_(len(cache), 3)
+    eq_(cache.info(), {'hits': 2, 'misses': 1, 'size': 3, 'maxsize': 3})
+
+    cache.clear()
+    eq_(cache.info(), {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 3})
@@ -1,10 +1,18 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-from metanl.freeling import english, spanish
-from metanl.mecab import normalize, tag_and_stem
-from metanl.extprocess import unicode_is_punctuation
+from metanl.freeling import english, spanish, FreelingWrapper
+from metanl.mecab import normalize, tag_and_stem, MeCabWrapper
+from metanl.extprocess import (unicode_is_punctuation, ProcessPool,
+                                ProcessWrapper, ProcessTimeout, ProcessError,
+                                ProcessUnavailable, RestartPolicy)
+from metanl.cache import LRUCache
+from metanl.stats import Stats
 from nose.tools import eq_
+from functools import partial
+import sys
+import threading
+import time
 
 
 def test_english():
@@ -47,6 +55,215 @@ def test_japanese():
     eq_(tag_and_stem('これはテストです。'), this_is_a_test)
 
 
+def test_batches():
+    texts = ["This is a test.\n\nIt has two paragraphs, and that's okay.",
+             "", "this has\ntwo lines"] * 50
+    eq_(english.tag_and_stem_many(texts),
+        [english.tag_and_stem(text) for text in texts])
+    eq_(english.normalize_many(texts),
+        [english.normalize(text) for text in texts])
+
+    ja_texts = ['これはテストです。', 'テスト' * 1000]
+    eq_(MeCabWrapper().normalize_list_many(ja_texts),
+        [MeCabWrapper().normalize_list(text) for text in ja_texts])
+
+
+def test_cache():
+    wrapper = FreelingWrapper('en', cache=LRUCache(100))
+    eq_(wrapper.normalize('big dogs'), 'big dog')
+    eq_(wrapper.normalize('big dogs'), 'big dog')
+    eq_(wrapper.cache.info()['hits'], 1)
+
+    # a cache passed to the method is used instead of the wrapper's
+    store = {}
+    eq_(wrapper.tag_and_stem_many(['big dogs', 'big dogs', 'cats'], store),
+        [english.tag_and_stem('big dogs')] * 2 +
+        [english.tag_and_stem('cats')])
+    eq_(len(store), 2)
+    eq_(wrapper.cache.info()['size'], 1)
+
+
+def test_process_pool():
+    texts = ["This is a test.", "It has two paragraphs, and that's okay.",
+             "this has\ntwo lines", "Dogs and cats"] * 5
+    pool = ProcessPool(partial(FreelingWrapper, 'en'), size=3)
+    expected = [english.tag_and_stem(text) for text in texts]
+    results = [None] * len(texts)
+
+    def work(i):
+        results[i] = pool.tag_and_stem(texts[i])
+
+    threads = [threading.Thread(target=work, args=(i,))
+               for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    eq_(results, expected)
+    assert len(pool._workers) <= 3
+
+    ja_pool = ProcessPool(MeCabWrapper, size=2)
+    eq_(ja_pool.normalize('これはテストです'), 'テスト')
+    eq_(ja_pool.tag_and_stem('これはテストです。'),
+        tag_and_stem('これはテストです。'))
+
+
+# A process that echoes each line back as a block of one record, except
+# that it never answers the line 'hang' and it crashes on the line 'crash'.
+ECHO_SCRIPT = """
+import sys, time
+for line in iter(sys.stdin.readline, ''):
+    if line == 'hang\\n':
+        time.sleep(60)
+    if line == 'crash\\n':
+        sys.exit(1)
+    sys.stdout.write(line + '\\n')
+    sys.stdout.flush()
+"""
+
+
+class EchoWrapper(ProcessWrapper):
+    def _get_command(self):
+        return [sys.executable, '-c', ECHO_SCRIPT]
+
+    def _get_input_lines(self, text):
+        return [text.encode('utf-8') + b'\n']
+
+    def _is_output_end(self, line):
+        return line == b'\n'
+
+    def _parse_output_line(self, line):
+        return line.strip()
+
+    def get_record_root(self, record):
+        return record
+
+    def get_record_token(self, record):
+        return record
+
+    def is_stopword_record(self, record, common_words=False):
+        return False
+
+
+class OldStyleEchoWrapper(EchoWrapper):
+    # Written before ProcessWrapper had an __init__, so it doesn't call it
+    def __init__(self, name):
+        self.name = name
+
+
+def test_old_style_subclass():
+    wrapper = OldStyleEchoWrapper('echo')
+    eq_(wrapper.normalize_list('hello'), ['hello'])
+    eq_(wrapper.tag_and_stem('hello'), [('hello', 'TERM', 'hello')])
+    eq_(wrapper.restart_policy.failures, 0)
+    assert wrapper.restart_policy is wrapper.restart_policy
+
+
+def test_timeout():
+    wrapper = EchoWrapper(timeout=1)
+    eq_(wrapper.analyze('hello'), ['hello'])
+    first_process = wrapper.process
+
+    start = time.time()
+    try:
+        wrapper.analyze('hang')
+        assert False, "analyze should have timed out"
+    except ProcessTimeout:
+        pass
+    assert time.time() - start < 10
+    assert first_process.poll() is not None
+
+    # a new process is started for the next text
+    eq_(wrapper.analyze_many(['a', 'b']), [['a'], ['b']])
+    assert wrapper.process is not first_process
+
+
+def test_stats():
+    stats = Stats()
+    wrapper = EchoWrapper(cache={}, stats=stats)
+    eq_(wrapper.normalize_list('hello'), ['hello'])
+    eq_(wrapper.normalize_list_many(['hello', 'world']), [['hello'],
+                                                          ['world']])
+    snapshot = stats.snapshot()
+    eq_(snapshot['counts']['EchoWrapper.cache_hits'], 1)
+    eq_(snapshot['counts']['EchoWrapper.cache_misses'], 2)
+    eq_(snapshot['counts']['EchoWrapper.bytes_in'], len('hello\nworld\n'))
+    eq_(snapshot['counts']['EchoWrapper.bytes_out'],
+        len('hello\n\nworld\n\n'))
+    eq_(snapshot['timings']['EchoWrapper.analyze']['count'], 1)
+    eq_(snapshot['timings']['EchoWrapper.parse']['count'], 2)
+
+
+def test_restart_policy():
+    policy = RestartPolicy(max_retries=2, backoff=0, failure_threshold=5,
+                           reset_after=60)
+    wrapper = EchoWrapper(restart_policy=policy)
+    eq_(wrapper.analyze('hello'), ['hello'])
+    first_process = wrapper.process
+    try:
+        wrapper.analyze('crash')
+        assert False, "analyze should have given up"
+    except ProcessError:
+        pass
+    eq_(policy.restarts, 2)
+    eq_(policy.failures, 3)
+    assert first_process.returncode is not None
+
+    # The process still works for other text
+    eq_(wrapper.analyze('hello'), ['hello'])
+    eq_(policy.consecutive_failures, 0)
+
+    # Too many failures in a row open the circuit
+    for _ in range(2):
+        try:
+            wrapper.analyze('crash')
+        except ProcessError:
+            pass
+    eq_(policy.stats()['state'], 'open')
+    try:
+        wrapper.analyze('hello')
+        assert False, "analyze should have failed fast"
+    except ProcessUnavailable:
+        pass
+    eq_(policy.stats()['rejected'], 1)
+
+
+def test_restart_policy_half_open():
+    policy = RestartPolicy(failure_threshold=2, reset_after=0.05)
+    policy.record_failure()
+    policy.record_failure()
+    eq_(policy.stats()['state'], 'open')
+    time.sleep(0.06)
+
+    # One request at a time is let through to test the process, and isn't
+    # retried
+    policy.check()
+    eq_(policy.stats()['state'], 'half-open')
+    assert not policy.should_retry(0)
+    try:
+        policy.check()
+        assert False, "only one request should be let through"
+    except ProcessUnavailable:
+        pass
+
+    # If it fails, the circuit opens again
+    policy.record_failure()
+    eq_(policy.stats()['state'], 'open')
+    try:
+        policy.check()
+        assert False, "the circuit should be open again"
+    except ProcessUnavailable:
+        pass
+
+    # If it succeeds, the circuit closes
+    time.sleep(0.06)
+    policy.check()
+    policy.record_success()
+    eq_(policy.stats()['state'], 'closed')
+    policy.check()
+    policy.check()
+
+
 def test_unicode_is_punctuation():
     assert unicode_is_punctuation('word') is False
     assert unicode_is_punctuation('。') is True
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from metanl.fakes import FakeMeCabWrapper, FakeFreelingWrapper
+from metanl.extprocess import (ProcessPool, ProcessError, ProcessTimeout,
+                               ProcessBatchError, RestartPolicy)
+from nose.tools import eq_
+from functools import partial
+import threading
+
+
+def test_fake_protocols():
+    eq_(FakeMeCabWrapper().tag_and_stem('テスト。'),
+        [('テスト', '名詞', 'テスト'), ('。', '.', '。')])
+    english = FakeFreelingWrapper('en')
+    eq_(english.tag_and_stem('The Dogs.'),
+        [('the', 'DT', 'The'), ('dogs', 'NN', 'Dogs'), ('.', '.', '.')])
+    eq_(english.normalize('the dogs\n\nbark'), 'dogs bark')
+
+
+def test_fake_batches():
+    # Lots of output for each line, so that analyze_many has to read while
+    # it's still writing
+    wrapper = FakeFreelingWrapper('en', repeat=20)
+    texts = ['word %d and more words' % i for i in range(500)] + ['', 'x']
+    analyses = wrapper.analyze_many(texts)
+    eq_(analyses, [wrapper.analyze(text) for text in texts])
+    eq_(len(analyses[0]), 100)
+
+    # MeCab's output is read a block at a time, which has to work however
+    # the blocks are split up when they're read
+    wrapper = FakeMeCabWrapper(repeat=3)
+    texts = ['テスト %d' % i for i in range(200)] + ['', 'eos']
+    expected = wrapper.analyze_many(texts)
+    eq_(len(expected[0]), 6)
+    eq_(expected[-1][0].surface, 'eos')
+    wrapper = FakeMeCabWrapper(repeat=3)
+    wrapper.read_size = 7
+    eq_(wrapper.analyze_many(texts), expected)
+    eq_([wrapper.analyze(text) for text in texts], expected)
+
+
+def test_fake_pool():
+    pool = ProcessPool(partial(FakeFreelingWrapper, 'en', delay=0.01),
+                       size=3)
+    texts = ['text number %d' % i for i in range(30)]
+    results = [None] * len(texts)
+
+    def work(i):
+        results[i] = pool.normalize(texts[i])
+
+    threads = [threading.Thread(target=work, args=(i,))
+               for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    eq_(results, texts)
+    eq_(len(pool._workers), 3)
+    eq_(pool.normalize_many(texts), texts)
+
+
+def test_fake_pool_warmup():
+    pool = ProcessPool(FakeMeCabWrapper, size=3)
+    pool.warmup()
+    eq_(len(pool._workers), 3)
+    for worker in pool._workers:
+        assert worker._process.poll() is None
+    eq_(pool.normalize_many(['テスト', 'ok']), ['テスト', 'ok'])
+
+
+def test_fake_timeout():
+    wrapper = FakeMeCabWrapper(hang_on='hang', timeout=0.5)
+    eq_(wrapper.normalize('テスト'), 'テスト')
+    try:
+        wrapper.normalize('hang')
+        assert False, "normalize should have timed out"
+    except ProcessTimeout:
+        pass
+    eq_(wrapper.normalize_many(['テスト', 'ok']), ['テスト', 'ok'])
+
+    # In a batch, the text that times out is skipped
+    try:
+        wrapper.normalize_many(['テスト', 'hang', 'ok'])
+        assert False, "normalize_many should have timed out on 'hang'"
+    except ProcessBatchError as e:
+        eq_(e.results, ['テスト', None, 'ok'])
+        assert isinstance(e.errors[1], ProcessTimeout)
+
+    # In a pool, the timeout is given to each wrapper by the factory.
+    pool = ProcessPool(partial(FakeMeCabWrapper, hang_on='hang', timeout=0.5),
+                       size=2)
+    try:
+        pool.normalize('hang')
+        assert False, "normalize should have timed out"
+    except ProcessTimeout:
+        pass
+    eq_(pool.normalize('テスト'), 'テスト')
+    eq_(pool._restart_policy, None)
+
+
+def test_fake_restarts():
+    # Each process crashes after answering 2 lines, but retrying each text
+    # in a new process gets through them all.
+    policy = RestartPolicy(backoff=0)
+    wrapper = FakeFreelingWrapper('en', crash_after=2, restart_policy=policy)
+    texts = ['text number %d' % i for i in range(6)]
+    eq_([wrapper.normalize(text) for text in texts], texts)
+    eq_(policy.restarts, 2)
+
+    # A text that always crashes the process is given up on.
+    wrapper = FakeFreelingWrapper('en', crash_on='boom',
+                                  restart_policy=RestartPolicy(backoff=0))
+    try:
+        wrapper.normalize('boom')
+        assert False, "normalize should have given up"
+    except ProcessError:
+        pass
+    eq_(wrapper.restart_policy.stats()['failures'], 4)
+
+
+def test_fake_batch_restarts():
+    # A batch that crashes the process is resumed from the first text that
+    # wasn't finished, so it gets through, the way separate texts would.
+    policy = RestartPolicy(backoff=0)
+    wrapper = FakeFreelingWrapper('en', crash_after=3, restart_policy=policy)
+    texts = ['text number %d' % i for i in range(10)]
+    eq_(wrapper.normalize_many(texts), texts)
+    eq_(policy.restarts, 3)
+
+    # A text that always crashes the process is given up on, and the rest
+    # of the batch is still analyzed.
+    policy = RestartPolicy(backoff=0)
+    wrapper = FakeFreelingWrapper('en', crash_on='boom',
+                                  restart_policy=policy)
+    texts = ['ok %d' % i for i in range(500)] + ['boom', 'after']
+    try:
+        wrapper.normalize_many(texts)
+        assert False, "normalize_many should have given up on 'boom'"
+    except ProcessBatchError as e:
+        eq_(e.results, texts[:500] + [None, 'after'])
+        eq_(list(e.errors), [500])
+    eq_(policy.stats()['failures'], 4)
+
+    # The results that were finished are cached, and the same goes for a
+    # pool of processes.
+    pool = ProcessPool(partial(FakeFreelingWrapper, 'en', crash_on='boom',
+                               restart_policy=RestartPolicy(backoff=0)),
+                       size=2, cache={})
+    texts = ['a', 'boom', 'b', 'c', 'boom cat']
+    try:
+        pool.normalize_many(texts)
+        assert False, "normalize_many should have given up on 'boom'"
+    except ProcessBatchError as e:
+        eq_(e.results, ['a', None, 'b', 'c', None])
+        eq_(sorted(e.errors), [1, 4])
+    eq_(pool.normalize_many(['c', 'a']), ['c', 'a'])
+    eq_(len(pool.cache), 3)
@@ -0,0 +1,33 @@
+from __future__ import unicode_literals
+
+from metanl.freeling import FreelingWrapper, FreelingRecord
+from metanl.fakes import FakeFreelingWrapper
+from nose.tools import eq_
+
+
+def test_parse_output():
+    wrapper = FreelingWrapper('en')
+    output = ('The the DT 0.99\n'
+              'Dogs Dogs NNP 0.5\n'
+              'ran run VBD 1\n')
+    records = wrapper._parse_output_bytes(output.encode('utf-8'))
+    eq_(records, [FreelingRecord('The', 'the', 'DT', '0.99', 'the'),
+                  FreelingRecord('Dogs', 'Dogs', 'NNP', '0.5', 'dogs'),
+                  FreelingRecord('ran', 'run', 'VBD', '1', 'run')])
+    # Records can still be indexed the way the lists of fields used to be
+    eq_(records[1][3], '0.5')
+    eq_([wrapper.get_record_root(record) for record in records],
+        ['the', 'dogs', 'run'])
+    eq_(wrapper._parse_output_line('Dogs Dogs NNP 0.5\n'), records[1])
+    eq_(wrapper._parse_output_bytes(b''), [])
+
+
+def test_records():
+    english = FakeFreelingWrapper('en')
+    eq_(english.analyze('The Dogs'),
+        [FreelingRecord('The', 'the', 'DT', '1', 'the'),
+         FreelingRecord('Dogs', 'dogs', 'NN', '1', 'dogs')])
+    eq_(english.normalize_list('The Dogs'), ['dogs'])
+    eq_(english.tag_and_stem('The Dogs'),
+        [('the', 'DT', 'The'), ('dogs', 'NN', 'Dogs')])
+    eq_(list(english.extract_phrases('The Dogs')), [('dogs', 'Dogs')])
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from metanl.leeds_corpus_reader import (FrequencyList, iter_entries,
+                                        source_data_path,
+                                        translate_leeds_corpus)
+from metanl.fakes import FakeFreelingWrapper
+from metanl import pipeline
+from metanl.extprocess import ProcessPool, RestartPolicy
+from functools import partial
+from nose.tools import eq_
+import io
+import os
+import shutil
+import tempfile
+
+SAMPLE = """<html><body><pre>
+The frequency distribution for attribute 'word' in corpus 'sample'
+For more information visit http://corpus.leeds.ac.uk/list.html
+ - corpus size: 1000 tokens
+ - lexicon size: 50 types
+1 100.5 the
+2 50 of the
+3 20.25 R&amp;D
+4 10 the
+</pre></body></html>
+"""
+
+
+def test_frequency_list():
+    tempdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tempdir, 'sample.num.html')
+        with io.open(filename, 'w', encoding='utf-8') as out:
+            out.write(SAMPLE)
+        with FrequencyList(filename) as freqs:
+            eq_(freqs.corpus_size, 1000)
+            eq_(freqs.lexicon_size, 50)
+            eq_(freqs.attribute, 'word')
+            eq_(len(freqs), 4)
+            eq_(freqs.frequency('the'), 100.5)
+            eq_(freqs.rank('of the'), 2)
+            eq_(freqs.word(3), 'R&D')
+            eq_(freqs.frequency('missing'), 0)
+            assert 'missing' not in freqs
+            eq_(list(freqs), list(iter_entries(filename)))
+            eq_(list(freqs)[1], (2, 50.0, 'of the'))
+    finally:
+        shutil.rmtree(tempdir)
+
+
+def test_source_data():
+    freqs = FrequencyList(source_data_path('internet-ja'))
+    eq_(freqs.corpus_size, 253071774)
+    eq_(freqs.entry(1), (1, 41309.58, 'の'))
+    for rank, freq, word in freqs:
+        assert freqs.frequency(word) >= freq
+    freqs.close()
+
+
+LIST = """The frequency distribution for attribute 'word' in corpus 'sample'
+ - corpus size: 1000 tokens
+1 100 Dogs
+2 50.5 dogs
+3 20.25 the
+4 10 DOGS
+5 5 cats
+"""
+
+
+def lowercase(word):
+    return word.lower()
+
+
+def crash_on_cats(word):
+    if word == 'cats':
+        raise KeyboardInterrupt
+    return word.lower()
+
+
+def read_lines(filename):
+    with io.open(filename, encoding='utf-8') as infile:
+        return infile.read().split('\n')
+
+
+def test_translate():
+    tempdir = tempfile.mkdtemp()
+    try:
+        infile = os.path.join(tempdir, 'sample.num')
+        outfile = os.path.join(tempdir, 'sample.txt')
+        with io.open(infile, 'w', encoding='utf-8') as out:
+            out.write(LIST)
+        expected = ['dogs,160.5', 'the,20.25', 'cats,5', '']
+
+        progress = []
+        translate_leeds_corpus(infile, outfile, lowercase,
+                               batch_size=2,
+                               progress=lambda *args: progress.append(args))
+        eq_(read_lines(outfile), expected)
+        eq_(progress, [(2, 5), (4, 5), (5, 5)])
+
+        # A run that's interrupted can be resumed
+        os.remove(outfile)
+        try:
+            translate_leeds_corpus(infile, outfile, crash_on_cats,
+                                   batch_size=2)
+            assert False, "the normalizer should have crashed"
+        except KeyboardInterrupt:
+            pass
+        assert os.path.exists(outfile + '.partial')
+        translate_leeds_corpus(infile, outfile, lowercase,
+                               batch_size=2,
+                               progress=lambda *args: progress.append(args))
+        eq_(read_lines(outfile), expected)
+        eq_(progress[-1], (5, 5))
+        assert not os.path.exists(outfile + '.partial')
+
+        # Normalizing in a multiprocessing pool, or with a pool of external
+        # processes
+        translate_leeds_corpus(infile, outfile, lowercase, processes=2)
+        eq_(read_lines(outfile), expected)
+        pool = ProcessPool(partial(FakeFreelingWrapper, 'en'), size=2)
+        translate_leeds_corpus(infile, outfile, pool, batch_size=2)
+        eq_(read_lines(outfile), expected)
+
+        # An analyzer given by name runs as many processes as asked for
+        requested = []
+
+        def get_fake_analyzer(name, processes=1):
+            requested.append((name, processes))
+            return ProcessPool(partial(FakeFreelingWrapper, 'en'),
+                               size=processes)
+        real_get_analyzer = pipeline.get_analyzer
+        pipeline.get_analyzer = get_fake_analyzer
+        try:
+            translate_leeds_corpus(infile, outfile, 'freeling-en',
+                                   processes=2)
+        finally:
+            pipeline.get_analyzer = real_get_analyzer
+        eq_(read_lines(outfile), expected)
+        eq_(requested, [('freeling-en', 2)])
+
+        # A word that the process keeps crashing on is left out, instead of
+        # stopping the job
+        crashing = FakeFreelingWrapper('en', crash_on='cats',
+                                       restart_policy=RestartPolicy(backoff=0))
+        translate_leeds_corpus(infile, outfile, crashing)
+        eq_(read_lines(outfile), expected[:2] + [''])
+    finally:
+        shutil.rmtree(tempdir)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from metanl import mecab
+from metanl.mecab import (KANA_TABLE, NOT_KANA, MeCabRecord, get_kana_info,
+                          records_to_kana, romanize_kana, romanize_records)
+from metanl.fakes import FakeMeCabWrapper
+from nose.tools import eq_
+
+
+def test_kana_table():
+    for char, info in KANA_TABLE.items():
+        eq_(info, get_kana_info(char))
+    for char in 'a日 ｱ':
+        assert char not in KANA_TABLE
+        eq_(get_kana_info(char), (char, NOT_KANA))
+
+
+def test_romanize_kana():
+    eq_(romanize_kana('シンブン'), 'shimbun')
+    eq_(romanize_kana('シンブン', respell=None), 'sinbun')
+    eq_(romanize_kana('トーキョー'), 'toukyou')
+    eq_(romanize_kana('キッテ'), 'kitte')
+    eq_(romanize_kana('ニャンコ'), 'nyanko')
+    eq_(romanize_kana('フジサン'), 'fujisan')
+    eq_(romanize_kana('コンイン'), "kon'in")
+    eq_(romanize_kana('カー・コー！'), 'kaa.kou!')
+
+
+def test_romanize_records():
+    records = [
+        MeCabRecord('新聞', '名詞', '一般', '*', '*', '*', '*', '新聞',
+                    'シンブン', 'シンブン'),
+        MeCabRecord('は', '助詞', '係助詞', '*', '*', '*', '*', 'は', 'ハ',
+                    'ワ'),
+        MeCabRecord('abc', '名詞', '固有名詞', '組織', '*', '*', '*', '*',
+                    None, None),
+    ]
+    eq_(records_to_kana(records), 'シンブン ワ abc')
+    eq_(romanize_records(records), 'shimbun wa abc')
+
+
+def test_parse_output():
+    wrapper = mecab.MeCabWrapper()
+    output = ('行か\t動詞,自立,*,*,五段・カ行促音便,未然形,行く,イカ,イカ\n'
+              'ん\t助動詞,*,*,*,不変化型,基本形,ん,ン,ン\n'
+              'ABC\t名詞,固有名詞,組織,*,*,*,*\n')
+    records = wrapper._parse_output_bytes(output.encode('utf-8'))
+    eq_([wrapper.get_record_root(record) for record in records],
+        ['行く', 'ない', 'ABC'])
+    eq_(records[2], MeCabRecord('ABC', '名詞', '固有名詞', '組織', '*', '*',
+                                '*', '*', None, None))
+    eq_(wrapper._parse_output_line('ん\t助動詞,*,*,*,不変化型,基本形,ん,ン,ン\n'),
+        records[1])
+    eq_(wrapper._parse_output_bytes(b''), [])
+
+
+def test_batches():
+    # The stand-in for MeCab gives every word the reading '*'.
+    real_mecab = mecab.MECAB
+    mecab.MECAB = FakeMeCabWrapper()
+    try:
+        eq_(mecab.to_kana_many(['ab cd', 'ef', 'ab cd', '']),
+            ['* *', '*', '* *', ''])
+        eq_(mecab.to_kana_many(text for text in ['ab', 'ab']), ['*', '*'])
+        eq_(mecab.romanize_many(['ab', 'ab']), ['*', '*'])
+    finally:
+        mecab.MECAB = real_mecab
@@ -1,7 +1,11 @@
 from __future__ import unicode_literals
 
-from metanl.nltk_morphy import normalize_list, tag_and_stem
+from metanl.nltk_morphy import (normalize_list, tag_and_stem, morphy_stem,
+                                normalize_list_many, tag_and_stem_many)
+from metanl import nltk_morphy
 from nose.tools import eq_
+import os
+import tempfile
 
 def test_normalize_list():
     # Strip away articles, unless there's only an article
@@ -32,3 +36,30 @@ def test_tag_and_stem():
                      (u'fragment', 'NNS', u'fragments'),
                      (u'.', '.', u'.')]
     eq_(tag_and_stem("I can't. Avoid fragments."), two_sentences)
+
+
+def test_many():
+    texts = ['the big dogs', 'the #big dog', "I can't. Avoid fragments.", '']
+    eq_(tag_and_stem_many(texts), [tag_and_stem(text) for text in texts])
+    eq_(normalize_list_many(texts), [normalize_list(text) for text in texts])
+
+
+def test_lemma_table():
+    words = ['dogs', 'was', 'singing', 'lobed', 'geese']
+    expected = [(morphy_stem(word), morphy_stem(word, 'VBD'))
+                for word in words]
+
+    handle, filename = tempfile.mkstemp(suffix='.txt')
+    os.close(handle)
+    try:
+        nltk_morphy.build_lemma_table(words, filename, limit=4)
+        nltk_morphy.load_lemma_table(filename)
+        assert ('dogs', 'n') in nltk_morphy.LEMMA_TABLE
+        assert ('geese', None) not in nltk_morphy.LEMMA_TABLE
+        nltk_morphy.set_stem_cache_size(0)
+        eq_([(morphy_stem(word), morphy_stem(word, 'VBD'))
+             for word in words], expected)
+    finally:
+        nltk_morphy.LEMMA_TABLE.clear()
+        nltk_morphy.set_stem_cache_size(100000)
+        os.remove(filename)
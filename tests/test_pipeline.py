@@ -0,0 +1,49 @@
+from __future__ import unicode_literals
+
+from metanl.pipeline import normalize_stream, write_stream
+from metanl import nltk_morphy
+from nose.tools import eq_
+import io
+
+
+class UppercaseAnalyzer(object):
+    """
+    A stand-in analyzer that keeps track of the batches it's given.
+    """
+    def __init__(self):
+        self.batches = []
+
+    def normalize_many(self, texts):
+        self.batches.append(len(texts))
+        return [text.upper() for text in texts]
+
+    def tag_and_stem(self, text):
+        return [(word.lower(), 'X', word) for word in text.split()]
+
+
+def test_stream_batches():
+    analyzer = UppercaseAnalyzer()
+    lines = ('line %d\n' % i for i in range(25))
+    results = normalize_stream(lines, analyzer, batch_size=10)
+    eq_(next(results), 'LINE 0')
+    # only the first batch has been read so far
+    eq_(analyzer.batches, [10])
+    eq_(list(results)[-1], 'LINE 24')
+    eq_(analyzer.batches, [10, 10, 5])
+
+
+def test_write_stream():
+    analyzer = UppercaseAnalyzer()
+    source = io.StringIO('Big Dogs\n\nsmall cats\n')
+    out = io.StringIO()
+    write_stream(normalize_stream(source, analyzer, 'tag_and_stem'), out)
+    eq_(out.getvalue(),
+        '[["big", "X", "Big"], ["dogs", "X", "Dogs"]]\n'
+        '[]\n'
+        '[["small", "X", "small"], ["cats", "X", "cats"]]\n')
+
+
+def test_stream_nltk():
+    lines = ['the dog', 'big dogs']
+    eq_(list(normalize_stream(lines, 'nltk', 'normalize_list')),
+        [nltk_morphy.normalize_list(line) for line in lines])
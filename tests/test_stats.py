@@ -0,0 +1,27 @@
+from __future__ import unicode_literals
+
+from metanl.stats import Stats
+from nose.tools import eq_
+
+
+def test_stats():
+    events = []
+    stats = Stats(callback=lambda *event: events.append(event))
+    stats.count('words', 3)
+    stats.count('words')
+    for seconds in [0.0000005, 0.001, 0.001, 0.5]:
+        stats.record_time('step', seconds)
+
+    snapshot = stats.snapshot()
+    eq_(snapshot['counts'], {'words': 4})
+    timing = snapshot['timings']['step']
+    eq_(timing['count'], 4)
+    eq_(timing['max'], 0.5)
+    eq_(timing['histogram'], [[1, 1], [1024, 2], [524288, 1]])
+    eq_(timing['p50'], 0.001024)
+    eq_(timing['p99'], 0.5)
+    eq_(len(events), 6)
+    eq_(events[0], ('count', 'words', 3))
+
+    stats.reset()
+    eq_(stats.snapshot(), {'counts': {}, 'timings': {}})
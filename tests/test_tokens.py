@@ -1,10 +1,31 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
-from metanl.token_utils import (tokenize, untokenize, un_camel_case,
+from metanl.token_utils import (tokenize, untokenize, untokenize_iter,
+                                un_camel_case, un_camel_case_many,
                                 string_pieces)
+from metanl.regex_tokenizer import split_sentences
 from nose.tools import eq_
 import nltk
 
+# Texts that the regex tokenizer should split the same way NLTK does. Each
+# is a single sentence, because these have been checked against the word
+# tokenizer that NLTK uses within a sentence, but not against Punkt's
+# sentence splitting, which decides cases such as "5 p.m. He waited."
+CONFORMANCE_TEXTS = [
+    "Time is an illusion.",
+    "Lunchtime, doubly so.",
+    '"Very deep," said Arthur, "you should send that in."',
+    "They've got a page for people like you.",
+    "We cannot go, and we won't; they're gonna wait (for now).",
+    "It's 3.50 or $4, isn't it?",
+    "He said 'no' -- twice, then he left...",
+    "Don't panic!",
+    "Where's my towel?",
+    "It cost 1,000,000 dollars, give or take.",
+    "She'd say \u201cwow\u201d and we'd all laugh.",
+    "I'll tell you: 'tis the season.",
+]
+
 def test_tokenize():
     # a snippet from Hitchhiker's Guide that just happens to have
     # most of the examples of punctuation we're looking for.
@@ -21,6 +42,24 @@ def test_tokenize():
     if nltk.__version__ >= '3':
         eq_(untokenize(tokenize(text2)), text2)
 
+def test_untokenize():
+    cases = [
+        (['He', 'said', ',', '``', 'Hi', "''", '.'], 'He said, "Hi".'),
+        (['I', 'ca', "n't", 'go', '!'], "I can't go!"),
+        (['do', 'n', "'t"], "don't"),
+        (['a', ',', '.', 'b'], 'a, . b'),
+        (['a', '.', '.', '.', 'b'], 'a... b'),
+        (['x', ',', ',', ',', "'s"], "x, ,,'s"),
+        (['We', 'can', 'not', 'wait', '%'], 'We cannot wait%'),
+    ]
+    for words, text in cases:
+        eq_(untokenize(words), text)
+        eq_(''.join(untokenize_iter(iter(words), buffer_size=1)), text)
+
+    words = ['He', 'said', ',', '``', 'Hi', "''", '.', 'I', 'ca', "n't"] * 100
+    eq_(''.join(untokenize_iter(words, buffer_size=3)), untokenize(words))
+
+
 def test_camel_case():
     eq_(un_camel_case('1984ZXSpectrumGames'), '1984 ZX Spectrum Games')
     eq_(un_camel_case('aaAa aaAaA 0aA AAAa!AAA'),
@@ -38,9 +77,38 @@ def test_camel_case():
     eq_(un_camel_case('Hindi-Urdu'),
         'Hindi-Urdu')
 
+    eq_(un_camel_case_many(['ZXSpectrum', '', 'Hindi-Urdu']),
+        ['ZX Spectrum', '', 'Hindi-Urdu'])
+    eq_(un_camel_case('MotörHead' * 10000),
+        ' '.join(['Mot\xf6r Head'] * 10000))
+
 
 def test_string_pieces():
     # Break as close to whitespace as possible
     text = "12 12 12345 123456 1234567-12345678"
     eq_(list(string_pieces(text, 6)),
         ['12 12 ', '12345 ', '123456', ' ', '123456', '7-', '123456', '78'])
+    eq_(list(string_pieces(text, 6, offsets=True)),
+        [(0, 6), (6, 12), (12, 18), (18, 19), (19, 25), (25, 27), (27, 33),
+         (33, 35)])
+
+    # Characters outside the BMP can be boundaries too, if they're
+    # unassigned, but CJK characters aren't
+    text = '\U00020000\U00020001\U000e0080\U00020002\U00020003'
+    eq_(list(string_pieces(text, 4)), [text[:3], text[3:]])
+    text = '\U00020000' * 5
+    eq_(list(string_pieces(text, 2)), [text[:2], text[2:4], text[4:]])
+
+
+def test_regex_tokenizer():
+    eq_(split_sentences("Mr. Dent lay in the mud. It was 5 p.m. He waited."),
+        ['Mr. Dent lay in the mud.', 'It was 5 p.m. He waited.'])
+    eq_(tokenize("I can't. Avoid fragments.", engine='regex'),
+        ['I', 'ca', "n't", '.', 'Avoid', 'fragments', '.'])
+    eq_(tokenize('"Very deep," said Arthur.', engine='regex'),
+        ['``', 'Very', 'deep', ',', "''", 'said', 'Arthur', '.'])
+
+
+def test_regex_conformance():
+    for text in CONFORMANCE_TEXTS:
+        eq_(tokenize(text, engine='regex'), tokenize(text, engine='nltk'))
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from metanl import wordlist as wordlist_module
+from metanl.wordlist import (Wordlist, compile_wordlist, get_frequency,
+                             get_wordlist, merge_lists)
+from nose.tools import eq_
+import codecs
+import os
+import shutil
+import tempfile
+
+
+def test_compiled_wordlist():
+    tempdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tempdir, 'sample.wl')
+        entries = [('the', 100.), ('of the', 50.), ('café', 20.),
+                   ('the', 10.), ('', 1.)]
+        compile_wordlist(entries, filename, corpus_size=1000)
+        wordlist = Wordlist(filename)
+        eq_(len(wordlist), 5)
+        eq_(wordlist.corpus_size, 1000)
+        eq_(wordlist.frequency('the'), 100.)
+        eq_(wordlist.rank('café'), 3)
+        eq_(wordlist.frequency('cafe'), 0)
+        assert 'of the' in wordlist
+        eq_(wordlist.word(2), 'of the')
+        eq_(list(wordlist.top(2)), entries[:2])
+        eq_(list(wordlist), entries)
+
+        # Compiling over an existing wordlist replaces it, and leaves no
+        # temporary files behind
+        compile_wordlist(entries[:2], filename)
+        eq_(len(Wordlist(filename)), 2)
+        eq_(os.listdir(tempdir), ['sample.wl'])
+    finally:
+        shutil.rmtree(tempdir)
+
+
+def test_source_wordlists():
+    eq_(get_frequency('de', 'es'), 54128.31)
+    eq_(get_frequency('の', 'ja'), 41309.58)
+    eq_(get_frequency('not a word', 'ja'), 0)
+    eq_(get_wordlist('internet-es').corpus_size, 145572631)
+
+
+def test_wordlist_dir():
+    tempdir = tempfile.mkdtemp()
+    real_dir = wordlist_module.WORDLIST_DIR
+    loaded = wordlist_module._WORDLISTS.pop('internet-ja', None)
+    wordlist_module.WORDLIST_DIR = os.path.join(tempdir, 'wordlists')
+    try:
+        eq_(get_frequency('の', 'ja'), 41309.58)
+        eq_(os.listdir(wordlist_module.WORDLIST_DIR), ['internet-ja.wl'])
+    finally:
+        wordlist_module.WORDLIST_DIR = real_dir
+        wordlist_module._WORDLISTS.pop('internet-ja', None)
+        if loaded is not None:
+            wordlist_module._WORDLISTS['internet-ja'] = loaded
+        shutil.rmtree(tempdir)
+
+
+def test_merge_lists():
+    tempdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tempdir, 'sample.wl')
+        # With a corpus size, frequencies are per million tokens.
+        compile_wordlist([('the', 500000.), ('cat', 250000.)], filename,
+                         corpus_size=1000)
+        wordlist = Wordlist(filename)
+        merged = merge_lists([
+            (wordlist, '', 100),
+            ({'cat': 3, 'dog': 1}, '', 100),
+            ([('the', 1)], '/en/', 2),
+        ])
+        eq_(list(merged), [('cat', 100.), ('the', 50.), ('dog', 25.),
+                           ('/en/the', 2.)])
+        eq_(merged.worddict['dog'], 25.)
+        eq_(merged.frequency('cow'), 0)
+        eq_(merged.log_freqs.tolist(), [6, 5, 4, 1])
+
+        merged.save(os.path.join(tempdir, 'linear.txt'))
+        merged.save_logarithmic(os.path.join(tempdir, 'log.txt'))
+        with codecs.open(os.path.join(tempdir, 'linear.txt'),
+                         encoding='utf-8') as infile:
+            eq_(infile.read(), 'cat,100\nthe,50\ndog,25\n/en/the,2\n')
+        with codecs.open(os.path.join(tempdir, 'log.txt'),
+                         encoding='utf-8') as infile:
+            eq_(infile.read(), 'cat,6\nthe,5\ndog,4\n/en/the,1\n')
+    finally:
+        shutil.rmtree(tempdir)
+
+
+def test_merge_raw_counts():
+    # 'rnc-modern' has raw counts, not frequencies per million, so it's
+    # divided by its corpus size to weigh the same as 'internet-ru'.
+    rnc = get_wordlist('rnc-modern')
+    merged = merge_lists([(rnc, '', 1), (get_wordlist('internet-ru'), '', 1)])
+    assert 0.04 < merged.frequency('и') < 0.06
+    eq_(merge_lists([(rnc, '', 1)]).frequency('и'),
+        rnc.frequency('и') / rnc.corpus_size)